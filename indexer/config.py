@@ -14,21 +14,39 @@ class Settings(BaseSettings):
     milvus_host: str = "localhost"
     milvus_port: int = 19530
     milvus_collection: str = "cenadi_documents"
+    milvus_vector_type: str = "float32"  # "float32" or "float16"; applies to new collections
+    milvus_index_type: str = "HNSW"  # "HNSW", "DISKANN" or "IVF_FLAT"; applies to new collections
+    milvus_metric_type: str = "IP"  # "IP" (normalized vectors) or "COSINE"; applies to new collections
+    milvus_hnsw_m: int = 16  # HNSW graph degree
+    milvus_hnsw_ef_construction: int = 200  # HNSW build-time candidate list
+    milvus_search_ef: int = 64  # HNSW/DISKANN search candidate list (higher: better recall, slower); raised to the result limit when smaller
+    milvus_search_nprobe: int = 10  # IVF lists probed per search
+    milvus_search_batch_window_ms: float = 5.0  # Coalesce concurrent searches into one RPC (0 disables)
+    milvus_search_concurrency: int = 8  # Max concurrent batched search RPCs
+    milvus_num_partitions: int = 16  # Partitions hashed from the division partition key
+    milvus_enable_bm25: bool = False  # BM25 full-text field for new collections (needs Milvus/pymilvus >= 2.5)
+    milvus_insert_batch_size: int = 1000  # Rows per insert RPC
+    milvus_insert_concurrency: int = 8  # Max concurrent insert RPCs
+    milvus_flush_interval: float = 5.0  # Seconds to coalesce writes before flushing
+    milvus_flush_max_pending: int = 100  # Flush early after this many writes
     
     # Embedding Configuration
     embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
     embedding_dimension: int = 384
     embedding_batch_size: int = 32  # Batch size for embedding generation
+    embedding_precision: str = "auto"  # "auto", "fp32", "fp16" (GPU) or "int8" (CPU)
     
     # OCR Configuration
     tesseract_languages: str = "fra+eng"
     ocr_dpi: int = 200  # Reduced from 300 for faster processing
     ocr_timeout: int = 120  # Timeout per page in seconds
+    ocr_workers: int = 0  # Pages OCR'd in parallel per document; 0 = CPU cores / max_concurrent_indexing
     
     # Document Processing
     documents_path: str = "/documents"
     max_file_size_mb: int = 100
     max_pages_per_document: int = 500  # Limit for very large PDFs
+    index_page_batch_size: int = 32  # Pages embedded and inserted together while streaming a PDF
     supported_extensions: list = [
         ".pdf",           # PDF documents
         ".png", ".jpg", ".jpeg", ".tiff", ".tif",  # Images (OCR)
@@ -53,6 +71,8 @@ class Settings(BaseSettings):
     # Caching
     enable_embedding_cache: bool = True
     cache_ttl_hours: int = 24
+    embedding_cache_dir: str = "/app/.cache/embeddings"
+    embedding_cache_size_mb: int = 2048  # LRU eviction beyond this size
     
     # Logging
     log_level: str = "info"
@@ -0,0 +1,28 @@
+# ==============================================================================
+# Gunicorn Configuration - Production server with a preloaded embedding model
+# ==============================================================================
+# The app (and with it the SentenceTransformer model) is imported once in the
+# master process. Workers are forked afterwards and share the weight pages
+# copy-on-write instead of each loading its own copy of the model.
+#
+# The master never runs inference: an OpenMP thread pool started before fork
+# is unusable in the children and hangs their first forward pass.
+
+import os
+
+from config import get_settings
+
+settings = get_settings()
+
+bind = "0.0.0.0:8000"
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+accesslog = None
+loglevel = settings.log_level
+
+
+def post_fork(server, worker):
+    """Give each worker its own share of the cores for torch inference."""
+    import torch
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) // workers))
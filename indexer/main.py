@@ -4,14 +4,22 @@
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 from pathlib import Path
 from loguru import logger
+from collections import Counter, deque
+from functools import lru_cache
+import ahocorasick
+import numpy as np
+import asyncio
+import heapq
 import time
 import os
 import hashlib
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from config import get_settings
 from services import (
@@ -20,6 +28,7 @@ from services import (
     milvus_service,
     FileWatcher
 )
+from services.pdf_processor import DocumentContent, PageContent
 
 
 # ==============================================================================
@@ -34,6 +43,19 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Document Indexer Service...")
     
+    # Blocking embedding/Milvus calls from search handlers run on this pool
+    executor = ThreadPoolExecutor(
+        max_workers=max(4, settings.max_concurrent_indexing * 2),
+        thread_name_prefix="indexer-io"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    
+    # File indexing gets its own pool so long jobs can't starve /search
+    app.state.index_executor = ThreadPoolExecutor(
+        max_workers=settings.max_concurrent_indexing,
+        thread_name_prefix="indexer-files"
+    )
+    
     # Connect to Milvus
     if not milvus_service.connect():
         logger.error("Failed to connect to Milvus")
@@ -56,6 +78,8 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'file_watcher'):
         app.state.file_watcher.stop()
     milvus_service.disconnect()
+    app.state.index_executor.shutdown(wait=False)
+    executor.shutdown(wait=False)
     logger.info("Shutdown complete")
 
 
@@ -67,7 +91,8 @@ app = FastAPI(
     title="CENADI Document Indexer",
     description="Document indexing service with OCR, embeddings, and vector search",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
@@ -129,6 +154,20 @@ class IndexResponse(BaseModel):
     file_path: str
     pages_indexed: int
     message: str
+    elapsed_ms: Optional[float] = None
+
+
+class IndexFilesRequest(BaseModel):
+    file_paths: List[str]
+    division: Optional[str] = None
+    user_id: Optional[str] = None
+
+
+class IndexFilesResponse(BaseModel):
+    success: bool
+    files_indexed: int
+    pages_indexed: int
+    results: List[IndexResponse]
 
 
 class StatusResponse(BaseModel):
@@ -142,104 +181,276 @@ class StatusResponse(BaseModel):
 # Helper Functions
 # ==============================================================================
 
-def generate_page_id(file_path: str, page_number: int) -> str:
-    """Generate unique ID for a page."""
-    content = f"{file_path}:{page_number}"
-    return hashlib.sha256(content.encode()).hexdigest()[:32]
+def page_id_hasher(file_path: str) -> "hashlib.blake2b":
+    """Hasher primed with the file prefix; copy() it per page to derive page IDs."""
+    return hashlib.blake2b(f"{file_path}:".encode(), digest_size=16)
 
 
-def extract_division_from_path(file_path: str) -> str:
-    """Extract division code from file path (e.g., /documents/DEL/file.pdf -> DEL)."""
-    parts = Path(file_path).parts
-    
-    # Known division codes
-    known_divisions = {
-        "DG",      # Direction Générale
-        "DEL",     # Direction des Études et de la Législation
-        "DRH",     # Direction des Ressources Humaines
-        "DAF",     # Direction Administrative et Financière
-        "DSI",     # Direction des Systèmes d'Information
-        "DCOM",    # Direction de la Communication
-        "DAJ",     # Direction des Affaires Juridiques
-        "DCOOP",   # Direction de la Coopération
-        "CENADI", 
-        "UPLOADS", # Generic uploads
-    }
+def generate_page_id(file_path: str, page_number: int, base: "hashlib.blake2b" = None) -> str:
+    """
+    Generate unique ID for a page (32 hex chars, BLAKE2b-128).
     
-    for part in parts:
-        if part.upper() in known_divisions:
+    Pass base=page_id_hasher(file_path) when generating many IDs for the
+    same file so the path prefix is hashed only once.
+    """
+    hasher = (base or page_id_hasher(file_path)).copy()
+    hasher.update(str(page_number).encode())
+    return hasher.hexdigest()
+
+
+# Known division codes
+KNOWN_DIVISIONS = frozenset({
+    "DG",      # Direction Générale
+    "DEL",     # Direction des Études et de la Législation
+    "DRH",     # Direction des Ressources Humaines
+    "DAF",     # Direction Administrative et Financière
+    "DSI",     # Direction des Systèmes d'Information
+    "DCOM",    # Direction de la Communication
+    "DAJ",     # Direction des Affaires Juridiques
+    "DCOOP",   # Direction de la Coopération
+    "CENADI", 
+    "UPLOADS", # Generic uploads
+})
+
+
+@lru_cache(maxsize=4096)
+def _division_for_dir(dir_path: str) -> str:
+    """Division code for a directory; cached since every file in it shares the answer."""
+    for part in Path(dir_path).parts:
+        if part.upper() in KNOWN_DIVISIONS:
             return part.upper()
     
     return "GENERAL"
 
 
+def extract_division_from_path(file_path: str) -> str:
+    """Extract division code from file path (e.g., /documents/DEL/file.pdf -> DEL)."""
+    return _division_for_dir(os.path.dirname(file_path))
+
+
 def get_text_snippet(text: str, max_length: int = 300) -> str:
     """Get a snippet of text for preview."""
     if len(text) <= max_length:
         return text
-    return text[:max_length].rsplit(' ', 1)[0] + "..."
+    # Cut at the last word boundary without slicing/splitting the long text
+    cut = text.rfind(' ', 0, max_length)
+    return (text[:cut] if cut > 0 else text[:max_length]) + "..."
+
+
+def iter_pdf_files(root: str) -> Iterator[str]:
+    """Recursively yield PDF paths under root using os.scandir (no per-entry Path objects)."""
+    try:
+        entries = os.scandir(root)
+    except OSError as e:
+        logger.error(f"Cannot scan {root}: {e}")
+        return
+    
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_pdf_files(entry.path)
+            elif entry.name.lower().endswith(".pdf"):
+                yield entry.path
+
+
+def extract_pdf(file_path: str) -> Optional[DocumentContent]:
+    """Extract a PDF with the worker process's own pdf_processor (picklable entry point)."""
+    return pdf_processor.process_pdf(file_path)
 
 
 def index_single_file(file_path: str, division: str = None, user_id: str = None) -> int:
     """
     Index a single file into Milvus.
     
+    Pages are streamed from the PDF and inserted in rolling batches, so only
+    one batch of pages is held in memory at a time.
+    
     Returns:
         Number of pages indexed
     """
-    settings = get_settings()
-    
     # Process PDF
-    doc_content = pdf_processor.process_pdf(file_path)
-    if not doc_content:
+    total_pages = pdf_processor.page_count(file_path)
+    if not total_pages:
         logger.error(f"Failed to process: {file_path}")
         return 0
     
+    # Extraction errors fail the file (index_pages rolls back its partial
+    # pages); Milvus errors propagate
+    extraction_failed = False
+    
+    def pages() -> Iterator[PageContent]:
+        nonlocal extraction_failed
+        try:
+            yield from pdf_processor.iter_pages(file_path)
+        except Exception:
+            extraction_failed = True
+            raise
+    
+    try:
+        return index_pages(
+            file_path,
+            pages(),
+            total_pages,
+            os.path.getsize(file_path),
+            division,
+            user_id
+        )
+    except Exception as e:
+        if not extraction_failed:
+            raise
+        logger.error(f"Failed to process PDF {file_path}: {e}")
+        return 0
+
+
+def index_document_content(
+    file_path: str,
+    doc_content: DocumentContent,
+    division: str = None,
+    user_id: str = None
+) -> int:
+    """
+    Embed already-extracted document content and insert it into Milvus.
+    
+    Returns:
+        Number of pages indexed
+    """
+    return index_pages(
+        file_path,
+        doc_content.pages,
+        doc_content.total_pages,
+        doc_content.file_size,
+        division,
+        user_id
+    )
+
+
+def index_pages(
+    file_path: str,
+    pages: Iterable[PageContent],
+    total_pages: int,
+    file_size: int,
+    division: str = None,
+    user_id: str = None
+) -> int:
+    """
+    Embed pages and insert them into Milvus in batches of index_page_batch_size.
+    
+    The file's existing pages are deleted just before the first batch is
+    inserted, so a file with no usable text keeps its previous index entries.
+    If the page stream or an insert fails after that, the pages written so far
+    are deleted again before the error is re-raised, so the index never holds
+    a partial document (the previous entries are gone at that point).
+    
+    Returns:
+        Number of pages indexed
+    """
+    settings = get_settings()
+    
     # Extract division from path if not provided
     if not division:
         division = extract_division_from_path(file_path)
     
-    # Prepare documents for insertion
-    documents = []
-    current_time = int(time.time())
+    # Values shared by every page of the document
+    path = Path(file_path)
+    doc_fields = {
+        "file_path": str(path.absolute()),
+        "file_name": path.name,
+        "total_pages": total_pages,
+        "division": division,
+        "user_id": user_id or "",
+        "created_at": int(time.time()),
+        "file_size": file_size,
+        "content_type": "application/pdf",
+    }
+    id_base = page_id_hasher(file_path)
+    
+    num_indexed = 0
+    deleted = False
+    written_pages: List[int] = []  # Page numbers sent to Milvus, for rollback
+    batch: List[PageContent] = []
+    
+    def flush_batch():
+        nonlocal num_indexed, deleted
+        if not deleted:
+            # Delete existing pages for this file first (re-indexing)
+            milvus_service.delete_by_file(file_path)
+            deleted = True
+        written_pages.extend(page.page_number for page in batch)
+        num_indexed += insert_page_batch(file_path, batch, doc_fields, id_base)
+        batch.clear()
     
-    for page in doc_content.pages:
-        if not page.text or len(page.text.strip()) < 10:
-            continue
-        
-        # Generate embedding
-        embedding = embedding_service.encode_single(page.text)
-        
-        # Create document record
-        doc = {
-            "id": generate_page_id(file_path, page.page_number),
-            "vector": embedding,
-            "file_path": doc_content.file_path,
-            "file_name": doc_content.file_name,
-            "page_number": page.page_number,
-            "total_pages": doc_content.total_pages,
-            "is_first_page": page.page_number == 1,
-            "is_last_page": page.page_number == doc_content.total_pages,
-            "division": division,
-            "user_id": user_id or "",
-            "text_content": page.text[:65000],  # Milvus VARCHAR limit
-            "language": page.language or "unknown",
-            "created_at": current_time,
-            "file_size": doc_content.file_size,
-            "content_type": "application/pdf"
-        }
-        documents.append(doc)
+    try:
+        for page in pages:
+            if page.text and len(page.text.strip()) >= 10:
+                batch.append(page)
+                if len(batch) >= settings.index_page_batch_size:
+                    flush_batch()
+        if batch:
+            flush_batch()
+    except Exception:
+        if written_pages:
+            logger.warning(
+                f"Indexing {file_path} failed, removing {len(written_pages)} partially indexed pages"
+            )
+            try:
+                milvus_service.delete_by_ids(
+                    [generate_page_id(file_path, n, id_base) for n in written_pages]
+                )
+            except Exception as e:
+                logger.error(f"Failed to roll back partial pages of {file_path}: {e}")
+        raise
     
-    # Insert into Milvus
-    if documents:
-        # Delete existing pages for this file first (re-indexing)
-        milvus_service.delete_by_file(file_path)
-        
-        # Insert new pages
-        milvus_service.insert_documents(documents)
-        logger.info(f"Indexed {len(documents)} pages from {doc_content.file_name}")
+    if num_indexed:
+        logger.info(f"Indexed {num_indexed} pages from {doc_fields['file_name']}")
+    return num_indexed
+
+
+def insert_page_batch(
+    file_path: str,
+    pages: List[PageContent],
+    doc_fields: Dict[str, Any],
+    id_base: "hashlib.blake2b"
+) -> int:
+    """
+    Embed one batch of pages and insert it into Milvus.
     
-    return len(documents)
+    Returns:
+        Number of pages inserted
+    """
+    settings = get_settings()
+    
+    # Boilerplate pages (letterheads, signature pages...) repeat verbatim:
+    # embed each distinct text once and fan the vector out to every page
+    unique_rows: Dict[str, int] = {}
+    page_rows = [
+        unique_rows.setdefault(page.text.strip(), len(unique_rows))
+        for page in pages
+    ]
+    
+    # Generate embeddings for all distinct pages in one batched forward pass
+    unique_embeddings = embedding_service.encode(
+        list(unique_rows),
+        normalize=True,
+        batch_size=settings.embedding_batch_size
+    )
+    
+    # Build the insert column-oriented (one list per field) so Milvus gets it
+    # without a row -> column transposition
+    num_pages = len(pages)
+    page_numbers = [page.page_number for page in pages]
+    columns = {
+        "id": [generate_page_id(file_path, n, id_base) for n in page_numbers],
+        "vector": unique_embeddings[page_rows],
+        "page_number": page_numbers,
+        "is_first_page": [n == 1 for n in page_numbers],
+        "is_last_page": [n == doc_fields["total_pages"] for n in page_numbers],
+        "text_content": [page.text[:65000] for page in pages],  # Milvus VARCHAR limit
+        "language": [page.language or "unknown" for page in pages],
+    }
+    for field, value in doc_fields.items():
+        columns[field] = [value] * num_pages
+    
+    return milvus_service.insert_documents(columns)
 
 
 # ==============================================================================
@@ -275,55 +486,55 @@ async def get_status():
 # ==============================================================================
 TRANSLATION_PAIRS = {
     # Finance/Legal terms
-    "loi": ["law", "act", "legislation"],
-    "finances": ["finance", "financial", "budget", "fiscal"],
-    "budget": ["budget", "budgetary"],
-    "décret": ["decree", "order", "regulation"],
-    "arrêté": ["order", "decree", "ruling"],
-    "contrat": ["contract", "agreement"],
-    "accord": ["agreement", "accord", "treaty"],
-    "prêt": ["loan", "lending"],
-    "emprunt": ["loan", "borrowing"],
-    "rapport": ["report", "statement"],
-    "procédure": ["procedure", "process"],
-    "règlement": ["regulation", "settlement", "rule"],
-    "impôt": ["tax", "taxation"],
-    "taxe": ["tax", "fee", "duty"],
-    "trésor": ["treasury", "treasure"],
-    "dette": ["debt", "liability"],
-    "créance": ["receivable", "claim", "debt"],
-    "dépense": ["expense", "expenditure", "spending"],
-    "recette": ["revenue", "income", "receipt"],
-    "exercice": ["fiscal year", "exercise", "financial year"],
-    "bilan": ["balance sheet", "assessment", "review"],
-    "comptabilité": ["accounting", "bookkeeping"],
-    "audit": ["audit", "review"],
-    "ministère": ["ministry", "department"],
-    "gouvernement": ["government", "administration"],
-    "république": ["republic"],
-    "cameroun": ["cameroon"],
+    "loi": ("law", "act", "legislation"),
+    "finances": ("finance", "financial", "budget", "fiscal"),
+    "budget": ("budget", "budgetary"),
+    "décret": ("decree", "order", "regulation"),
+    "arrêté": ("order", "decree", "ruling"),
+    "contrat": ("contract", "agreement"),
+    "accord": ("agreement", "accord", "treaty"),
+    "prêt": ("loan", "lending"),
+    "emprunt": ("loan", "borrowing"),
+    "rapport": ("report", "statement"),
+    "procédure": ("procedure", "process"),
+    "règlement": ("regulation", "settlement", "rule"),
+    "impôt": ("tax", "taxation"),
+    "taxe": ("tax", "fee", "duty"),
+    "trésor": ("treasury", "treasure"),
+    "dette": ("debt", "liability"),
+    "créance": ("receivable", "claim", "debt"),
+    "dépense": ("expense", "expenditure", "spending"),
+    "recette": ("revenue", "income", "receipt"),
+    "exercice": ("fiscal year", "exercise", "financial year"),
+    "bilan": ("balance sheet", "assessment", "review"),
+    "comptabilité": ("accounting", "bookkeeping"),
+    "audit": ("audit", "review"),
+    "ministère": ("ministry", "department"),
+    "gouvernement": ("government", "administration"),
+    "république": ("republic",),
+    "cameroun": ("cameroon",),
     # Administrative terms
-    "document": ["document", "file", "record"],
-    "dossier": ["file", "folder", "case"],
-    "administration": ["administration", "management"],
-    "direction": ["directorate", "department", "direction"],
-    "service": ["service", "department"],
+    "document": ("document", "file", "record"),
+    "dossier": ("file", "folder", "case"),
+    "administration": ("administration", "management"),
+    "direction": ("directorate", "department", "direction"),
+    "service": ("service", "department"),
     # English to French (reverse lookup)
-    "law": ["loi", "droit", "législation"],
-    "finance": ["finances", "financier", "budget"],
-    "budget": ["budget", "budgétaire"],
-    "decree": ["décret", "arrêté"],
-    "loan": ["prêt", "emprunt"],
-    "agreement": ["accord", "contrat", "convention"],
-    "report": ["rapport", "compte-rendu"],
-    "tax": ["impôt", "taxe", "fiscal"],
-    "treasury": ["trésor", "trésorerie"],
-    "ministry": ["ministère"],
-    "government": ["gouvernement"],
+    "law": ("loi", "droit", "législation"),
+    "finance": ("finances", "financier", "budget"),
+    "budget": ("budget", "budgétaire"),
+    "decree": ("décret", "arrêté"),
+    "loan": ("prêt", "emprunt"),
+    "agreement": ("accord", "contrat", "convention"),
+    "report": ("rapport", "compte-rendu"),
+    "tax": ("impôt", "taxe", "fiscal"),
+    "treasury": ("trésor", "trésorerie"),
+    "ministry": ("ministère",),
+    "government": ("gouvernement",),
 }
 
 
-def get_translated_terms(query_terms: list) -> set:
+def get_translated_terms(query_terms: Iterable[str]) -> set:
     """Get translated equivalents for query terms."""
     translated = set()
     for term in query_terms:
@@ -336,6 +547,53 @@ def get_translated_terms(query_terms: list) -> set:
     return translated
 
 
+@lru_cache(maxsize=2048)
+def prepare_query(query: str) -> Tuple[str, Tuple[str, ...], frozenset]:
+    """
+    Normalize a raw query and expand it with translations.
+    
+    Cached per raw query string so repeated searches skip tokenization
+    and translation lookups.
+    
+    Returns:
+        Tuple of (lowercased query, query terms, original + translated terms)
+    """
+    query_lower = query.lower().strip()
+    query_terms = tuple(query_lower.split())
+    return query_lower, query_terms, frozenset(get_translated_terms(query_terms))
+
+
+def build_term_automaton(
+    query_terms: list,
+    translated_terms: set
+) -> Tuple[Optional[ahocorasick.Automaton], np.ndarray, List[str]]:
+    """
+    Build an Aho-Corasick automaton over the query and translated terms.
+    
+    Each word maps to its (original column, translated column) in the presence
+    matrices built by the phrase scorer, -1 when absent from that set.
+    
+    Returns:
+        Tuple of (automaton or None when there is nothing to match,
+        occurrences of each original term in query_terms, translated column order)
+    """
+    orig_counts = Counter(query_terms)
+    orig_cols = {term: i for i, term in enumerate(orig_counts)}
+    trans_order = list(translated_terms)
+    trans_cols = {term: i for i, term in enumerate(trans_order)}
+    orig_weights = np.fromiter(orig_counts.values(), dtype=np.int32, count=len(orig_counts))
+    
+    words = orig_cols.keys() | trans_cols.keys()
+    if not words:
+        return None, orig_weights, trans_order
+    
+    automaton = ahocorasick.Automaton()
+    for term in words:
+        automaton.add_word(term, (orig_cols.get(term, -1), trans_cols.get(term, -1)))
+    automaton.make_automaton()
+    return automaton, orig_weights, trans_order
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search_documents(request: SearchRequest):
     """
@@ -345,58 +603,70 @@ async def search_documents(request: SearchRequest):
     start_time = time.time()
     
     results = []
-    query_lower = request.query.lower().strip()
-    query_terms = query_lower.split()
     
-    # Get translated terms for cross-language matching
-    all_search_terms = get_translated_terms(query_terms)
+    # Normalized query, its terms and their translations for cross-language matching
+    query_lower, query_terms, all_search_terms = prepare_query(request.query)
     
     # Get the actual search mode (supports both 'mode' and 'search_mode' fields)
     search_mode = request.get_mode()
     
-    def calculate_phrase_boost(text: str, query: str, terms: list, translated_terms: set) -> float:
+    # Single automaton over original + translated terms, built once per query
+    term_automaton, orig_weights, trans_order = build_term_automaton(query_terms, all_search_terms)
+    
+    def calculate_phrase_boosts(texts_lower: List[str]) -> np.ndarray:
         """
-        Calculate a boost score based on phrase matching.
+        Calculate boost scores for a batch of lowercased texts based on phrase matching.
         Supports cross-language matching with translations.
         - Exact phrase match: +0.3
         - All original terms present: +0.2
         - Translated terms match: +0.15
         - Partial term matches: proportional boost
         """
-        text_lower = text.lower()
-        boost = 0.0
+        n = len(texts_lower)
+        num_orig = len(orig_weights)
+        phrase_hits = np.zeros(n, dtype=np.bool_)
+        orig_hits = np.zeros((n, num_orig), dtype=np.bool_)
+        trans_hits = np.zeros((n, len(trans_order)), dtype=np.bool_)
         
-        # Check for exact phrase match (highest boost)
-        if query in text_lower:
-            boost += 0.3
-        
-        # Check how many original terms are present
-        if terms:
-            matched_terms = sum(1 for term in terms if term in text_lower)
-            term_ratio = matched_terms / len(terms)
+        for i, text_lower in enumerate(texts_lower):
+            # Check for exact phrase match (highest boost)
+            phrase_hits[i] = query_lower in text_lower
             
-            if term_ratio == 1.0:
-                # All original terms present
-                boost += 0.2
-            elif term_ratio > 0:
-                # Partial match of original terms
-                boost += term_ratio * 0.1
+            # One linear pass over the text marks every original/translated term present
+            if term_automaton is not None:
+                found_orig = set()
+                for _, (orig_col, trans_col) in term_automaton.iter(text_lower):
+                    if trans_col >= 0:
+                        trans_hits[i, trans_col] = True
+                    if orig_col >= 0 and orig_col not in found_orig:
+                        orig_hits[i, orig_col] = True
+                        found_orig.add(orig_col)
+                        # All original terms present: translated terms no longer matter
+                        if len(found_orig) == num_orig:
+                            break
+        
+        boosts = np.where(phrase_hits, 0.3, 0.0)
         
-        # Check for translated term matches (cross-language support)
-        if translated_terms and boost < 0.2:  # Only if no strong original match
-            matched_translated = sum(1 for term in translated_terms if term in text_lower)
-            if matched_translated > 0:
-                trans_ratio = matched_translated / len(translated_terms)
-                # Boost for translated term matches
-                boost += min(0.15, trans_ratio * 0.15)
+        # Share of original terms present (duplicates in the query count each time)
+        if query_terms:
+            term_ratio = (orig_hits @ orig_weights) / len(query_terms)
+            boosts += np.where(term_ratio == 1.0, 0.2, term_ratio * 0.1)
         
-        return boost
+        # Translated term matches (cross-language), only if no strong original match
+        if trans_order:
+            trans_ratio = trans_hits.sum(axis=1) / len(trans_order)
+            boosts += np.where(boosts < 0.2, np.minimum(0.15, trans_ratio * 0.15), 0.0)
+        
+        return boosts
     
     if search_mode == "semantic":
         # Semantic search with phrase boosting
-        query_embedding = embedding_service.encode_single(request.query)
+        query_embedding = await asyncio.to_thread(
+            embedding_service.encode_single, request.query
+        )
         
-        semantic_results = milvus_service.search(
+        semantic_results = await asyncio.to_thread(
+            milvus_service.search,
             query_vector=query_embedding,
             division_filter=request.division,
             limit=request.limit * 2  # Get more to filter
@@ -404,112 +674,109 @@ async def search_documents(request: SearchRequest):
         
         # Filter and boost based on phrase matching (including cross-language)
         MIN_SEMANTIC_SCORE = 0.30  # Lower threshold to allow cross-language matches
-        for r in semantic_results:
-            if r.score >= MIN_SEMANTIC_SCORE:
-                text_content = r.text_content or ""
-                phrase_boost = calculate_phrase_boost(text_content, query_lower, query_terms, all_search_terms)
-                r.score = min(1.0, r.score + phrase_boost)  # Cap at 1.0
-                results.append(r)
+        results = [r for r in semantic_results if r.score >= MIN_SEMANTIC_SCORE]
+        phrase_boosts = calculate_phrase_boosts([r.text_lower for r in results])
+        for r, phrase_boost in zip(results, phrase_boosts):
+            r.score = min(1.0, r.score + float(phrase_boost))  # Cap at 1.0
     
     elif search_mode == "keyword":
         # Pure keyword search - only return documents containing the search terms
-        keyword_results = milvus_service.keyword_search(
+        keyword_results = await asyncio.to_thread(
+            milvus_service.keyword_search,
             query=request.query,
             division_filter=request.division,
             limit=request.limit
         )
         
         # Boost results with exact phrase matches (including translations)
-        for kr in keyword_results:
-            text_content = kr.text_content or ""
-            phrase_boost = calculate_phrase_boost(text_content, query_lower, query_terms, all_search_terms)
-            kr.score = min(1.0, kr.score + phrase_boost)
+        phrase_boosts = calculate_phrase_boosts([kr.text_lower for kr in keyword_results])
+        for kr, phrase_boost in zip(keyword_results, phrase_boosts):
+            kr.score = min(1.0, kr.score + float(phrase_boost))
         
         results = keyword_results
     
     else:  # hybrid (default)
         # Hybrid mode: Combine semantic similarity with phrase matching
         
-        # Get semantic results first
-        query_embedding = embedding_service.encode_single(request.query)
-        semantic_results = milvus_service.search(
-            query_vector=query_embedding,
-            division_filter=request.division,
-            limit=request.limit * 3  # Get more for comprehensive matching
-        )
+        async def run_semantic_search():
+            query_embedding = await asyncio.to_thread(
+                embedding_service.encode_single, request.query
+            )
+            return await asyncio.to_thread(
+                milvus_service.search,
+                query_vector=query_embedding,
+                division_filter=request.division,
+                limit=request.limit * 3  # Get more for comprehensive matching
+            )
         
-        # Get keyword matches
-        keyword_results = milvus_service.keyword_search(
-            query=request.query,
-            division_filter=request.division,
-            limit=request.limit * 2
+        # Keyword matching does not need the embedding: run both retrievals concurrently
+        semantic_results, keyword_results = await asyncio.gather(
+            run_semantic_search(),
+            asyncio.to_thread(
+                milvus_service.keyword_search,
+                query=request.query,
+                division_filter=request.division,
+                limit=request.limit * 2
+            )
         )
         
-        # Create maps for merging
-        semantic_scores = {r.id: r for r in semantic_results}
         keyword_ids = {r.id for r in keyword_results}
         
-        # Process all semantic results with boosting (cross-language aware)
-        for sr in semantic_results:
-            text_content = sr.text_content or ""
-            phrase_boost = calculate_phrase_boost(text_content, query_lower, query_terms, all_search_terms)
-            
-            # Base semantic score
-            base_score = sr.score
-            
-            # Boost if also found in keyword search
-            if sr.id in keyword_ids:
-                base_score += 0.2
-            
-            # Add phrase boost
-            sr.score = min(1.0, base_score + phrase_boost)
-            
-            # Only include if score is above threshold or has phrase match
-            if sr.score >= 0.4 or phrase_boost > 0:
+        # Score all semantic results at once (cross-language aware):
+        # semantic score + 0.2 if also a keyword hit + phrase boost, capped at 1.0
+        n = len(semantic_results)
+        base_scores = np.fromiter((sr.score for sr in semantic_results), dtype=np.float64, count=n)
+        in_keywords = np.fromiter((sr.id in keyword_ids for sr in semantic_results), dtype=np.bool_, count=n)
+        phrase_boosts = calculate_phrase_boosts([sr.text_lower for sr in semantic_results])
+        scores = np.minimum(1.0, base_scores + np.where(in_keywords, 0.2, 0.0) + phrase_boosts)
+        
+        # Only include if score is above threshold or has phrase match
+        keep = (scores >= 0.4) | (phrase_boosts > 0)
+        for sr, score, kept in zip(semantic_results, scores.tolist(), keep.tolist()):
+            sr.score = score
+            if kept:
                 results.append(sr)
         
         # Add keyword results not in semantic results
         existing_ids = {r.id for r in results}
-        for kr in keyword_results:
-            if kr.id not in existing_ids:
-                text_content = kr.text_content or ""
-                phrase_boost = calculate_phrase_boost(text_content, query_lower, query_terms, all_search_terms)
-                kr.score = min(1.0, 0.5 + phrase_boost)  # Base score for keyword match
-                results.append(kr)
-    
-    # Sort by score (descending)
-    results.sort(key=lambda x: x.score, reverse=True)
-    
-    # Limit results
-    results = results[:request.limit]
-    
-    # Convert to response format
+        keyword_only = [kr for kr in keyword_results if kr.id not in existing_ids]
+        phrase_boosts = calculate_phrase_boosts([kr.text_lower for kr in keyword_only])
+        for kr, phrase_boost in zip(keyword_only, phrase_boosts):
+            kr.score = min(1.0, 0.5 + float(phrase_boost))  # Base score for keyword match
+            results.append(kr)
+    
+    # Top results by score (descending), without sorting the whole candidate list
+    results = heapq.nlargest(request.limit, results, key=lambda x: x.score)
+    
+    # Convert to response format. Results come from our own index, so the
+    # payload is built as plain dicts (same shape as SearchResultItem) and
+    # serialized by orjson without a pydantic validation pass.
     response_results = [
-        SearchResultItem(
-            id=r.id,
-            score=r.score,
-            file_path=r.file_path,
-            file_name=r.file_name,
-            page_number=r.page_number,
-            total_pages=r.total_pages,
-            division=r.division,
-            text_snippet=get_text_snippet(r.text_content),
-            language=r.language,
-            is_first_page=r.is_first_page,
-            is_last_page=r.is_last_page
-        )
+        {
+            "id": r.id,
+            "score": r.score,
+            "file_path": r.file_path,
+            "file_name": r.file_name,
+            "page_number": r.page_number,
+            "total_pages": r.total_pages,
+            "division": r.division,
+            "text_snippet": get_text_snippet(r.text_content),
+            "language": r.language,
+            "is_first_page": r.is_first_page,
+            "is_last_page": r.is_last_page
+        }
         for r in results
     ]
     
     search_time = (time.time() - start_time) * 1000
     
-    return SearchResponse(
-        query=request.query,
-        mode=search_mode,
-        total_results=len(response_results),
-        results=response_results,
-        search_time_ms=round(search_time, 2)
-    )
+    return ORJSONResponse({
+        "query": request.query,
+        "mode": search_mode,
+        "total_results": len(response_results),
+        "results": response_results,
+        "search_time_ms": round(search_time, 2)
+    })
 
 
 @app.post("/index/file", response_model=IndexResponse)
@@ -524,10 +791,12 @@ async def index_file(request: IndexRequest, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
     # Index the file
-    pages_indexed = index_single_file(
-        file_path=file_path,
-        division=request.division,
-        user_id=request.user_id
+    pages_indexed = await asyncio.get_running_loop().run_in_executor(
+        app.state.index_executor,
+        index_single_file,
+        file_path,
+        request.division,
+        request.user_id
     )
     
     return IndexResponse(
@@ -538,6 +807,60 @@ async def index_file(request: IndexRequest, background_tasks: BackgroundTasks):
     )
 
 
+@app.post("/index/files", response_model=IndexFilesResponse)
+async def index_files(request: IndexFilesRequest):
+    """
+    Index several files in one request.
+    
+    Files are indexed concurrently (up to max_concurrent_indexing at a time)
+    and reported individually, in request order.
+    """
+    settings = get_settings()
+    limiter = asyncio.Semaphore(settings.max_concurrent_indexing)
+    
+    async def index_one(file_path: str) -> IndexResponse:
+        if not os.path.exists(file_path):
+            return IndexResponse(
+                success=False, file_path=file_path, pages_indexed=0,
+                message=f"File not found: {file_path}"
+            )
+        if not file_path.lower().endswith('.pdf'):
+            return IndexResponse(
+                success=False, file_path=file_path, pages_indexed=0,
+                message="Only PDF files are supported"
+            )
+        
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                pages_indexed = await asyncio.get_running_loop().run_in_executor(
+                    app.state.index_executor,
+                    index_single_file, file_path, request.division, request.user_id
+                )
+            except Exception as e:
+                logger.error(f"Failed to index {file_path}: {e}")
+                pages_indexed = 0
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        return IndexResponse(
+            success=pages_indexed > 0,
+            file_path=file_path,
+            pages_indexed=pages_indexed,
+            message=f"Indexed {pages_indexed} pages" if pages_indexed > 0 else "Failed to index file",
+            elapsed_ms=round(elapsed_ms, 1)
+        )
+    
+    results = await asyncio.gather(*(index_one(path) for path in request.file_paths))
+    indexed = [result for result in results if result.success]
+    
+    return IndexFilesResponse(
+        success=len(indexed) == len(results),
+        files_indexed=len(indexed),
+        pages_indexed=sum(result.pages_indexed for result in indexed),
+        results=results
+    )
+
+
 @app.post("/index/directory")
 async def index_directory(
     path: Optional[str] = None,
@@ -554,15 +877,34 @@ async def index_directory(
         raise HTTPException(status_code=404, detail=f"Directory not found: {scan_path}")
     
     # Count files
-    pdf_files = list(Path(scan_path).rglob("*.pdf"))
+    pdf_files = list(iter_pdf_files(scan_path))
     
     # Start background indexing
+    def index_extracted(pdf_path: str, future) -> None:
+        try:
+            doc_content = future.result()
+            if not doc_content:
+                logger.error(f"Failed to process: {pdf_path}")
+                return
+            index_document_content(pdf_path, doc_content)
+        except Exception as e:
+            logger.error(f"Failed to index {pdf_path}: {e}")
+    
     def background_index():
-        for pdf_path in pdf_files:
-            try:
-                index_single_file(str(pdf_path))
-            except Exception as e:
-                logger.error(f"Failed to index {pdf_path}: {e}")
+        # PDF extraction/OCR is CPU-bound and runs in worker processes; embedding
+        # and Milvus inserts stay here, where the model and connection live.
+        # At most 2 x workers files are submitted at once, so extracted documents
+        # don't pile up in memory faster than they can be embedded.
+        workers = settings.max_concurrent_indexing
+        window = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: "deque[Tuple[str, Any]]" = deque()
+            for pdf_path in pdf_files:
+                pending.append((pdf_path, executor.submit(extract_pdf, pdf_path)))
+                if len(pending) >= window:
+                    index_extracted(*pending.popleft())
+            while pending:
+                index_extracted(*pending.popleft())
     
     background_tasks.add_task(background_index)
     
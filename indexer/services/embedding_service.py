@@ -3,8 +3,11 @@
 # ==============================================================================
 
 from sentence_transformers import SentenceTransformer
+import torch
+from diskcache import Cache
 from loguru import logger
-from typing import List, Union
+from typing import List, Optional, Union
+import hashlib
 import numpy as np
 
 from config import get_settings
@@ -18,6 +21,8 @@ class EmbeddingService:
     
     _instance = None
     _model = None
+    _precision = "fp32"  # Precision the model actually runs in (part of cache keys)
+    _cache = None
     
     def __new__(cls):
         """Singleton pattern to avoid loading model multiple times."""
@@ -28,6 +33,8 @@ class EmbeddingService:
     def __init__(self):
         if self._model is None:
             self._load_model()
+        if self._cache is None:
+            self._open_cache()
     
     def _load_model(self):
         """Load the embedding model."""
@@ -35,10 +42,14 @@ class EmbeddingService:
         logger.info(f"Loading embedding model: {settings.embedding_model}")
         
         try:
-            self._model = SentenceTransformer(settings.embedding_model)
-            # Verify dimension matches configuration
-            test_embedding = self._model.encode("test")
-            actual_dim = len(test_embedding)
+            self._model = self._apply_precision(
+                SentenceTransformer(settings.embedding_model),
+                settings.embedding_precision
+            )
+            # Verify dimension matches configuration. Read from the model config
+            # rather than a test encode: a forward pass here would start torch's
+            # thread pool in the gunicorn master, which hangs forked workers.
+            actual_dim = self._model.get_sentence_embedding_dimension()
             
             if actual_dim != settings.embedding_dimension:
                 logger.warning(
@@ -53,13 +64,75 @@ class EmbeddingService:
             logger.error(f"Failed to load embedding model: {e}")
             raise
     
-    def encode(self, text: Union[str, List[str]], normalize: bool = True) -> np.ndarray:
+    def _apply_precision(self, model: SentenceTransformer, precision: str) -> SentenceTransformer:
+        """
+        Reduce model precision for faster inference.
+        
+        "auto" picks fp16 on GPU and int8 dynamic quantization on CPU;
+        MiniLM retrieval quality is essentially unaffected by either.
+        """
+        if precision == "auto":
+            precision = "fp16" if torch.cuda.is_available() else "int8"
+        
+        if precision == "fp16":
+            if not torch.cuda.is_available():
+                logger.warning("fp16 embeddings requested without a GPU, keeping fp32")
+                return model
+            model = model.half()
+        elif precision == "int8":
+            # int8 Linear layers (oneDNN/VNNI kernels on supporting CPUs)
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif precision != "fp32":
+            logger.warning(f"Unknown embedding precision '{precision}', keeping fp32")
+            return model
+        
+        self._precision = precision
+        logger.info(f"Embedding model running in {precision}")
+        return model
+    
+    def _open_cache(self):
+        """Open the on-disk embedding cache, if enabled."""
+        settings = get_settings()
+        if not settings.enable_embedding_cache:
+            return
+        
+        try:
+            self._cache = Cache(
+                settings.embedding_cache_dir,
+                size_limit=settings.embedding_cache_size_mb * 1024 * 1024,
+                eviction_policy="least-recently-used"
+            )
+            logger.info(f"Embedding cache enabled at {settings.embedding_cache_dir}")
+        except Exception as e:
+            logger.warning(f"Embedding cache unavailable, continuing without it: {e}")
+            self._cache = None
+    
+    def _cache_key(self, text: str, normalize: bool) -> bytes:
+        """
+        Cache key for a (model, precision, normalization, text) tuple.
+        
+        The resolved precision is included so that fp32, fp16 and int8
+        vectors never mix after embedding_precision changes.
+        """
+        settings = get_settings()
+        content = f"{settings.embedding_model}:{self._precision}:{int(normalize)}:{text}"
+        return hashlib.sha256(content.encode()).digest()
+    
+    def encode(
+        self,
+        text: Union[str, List[str]],
+        normalize: bool = True,
+        batch_size: Optional[int] = None
+    ) -> np.ndarray:
         """
         Generate embeddings for text(s).
         
         Args:
             text: Single text string or list of texts
             normalize: Whether to L2-normalize the embeddings (recommended for similarity search)
+            batch_size: Texts per forward pass (default: settings.embedding_batch_size)
             
         Returns:
             Numpy array of embeddings. Shape: (dim,) for single text, (n, dim) for list
@@ -70,29 +143,61 @@ class EmbeddingService:
         # Clean empty strings
         text = [t.strip() if t else "" for t in text]
         
+        settings = get_settings()
+        if batch_size is None:
+            batch_size = settings.embedding_batch_size
+        
+        if self._cache is None:
+            return self._encode_batch(text, normalize, batch_size)
+        
+        # Probe the cache; only texts never seen before go through the model
+        keys = [self._cache_key(t, normalize) for t in text]
+        embeddings = np.empty((len(text), self.dimension), dtype=np.float32)
+        missed = []
+        for i, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                missed.append(i)
+            else:
+                embeddings[i] = np.frombuffer(cached, dtype=np.float16)
+        
+        if missed:
+            computed = self._encode_batch([text[i] for i in missed], normalize, batch_size)
+            ttl = settings.cache_ttl_hours * 3600
+            for i, vector in zip(missed, computed):
+                embeddings[i] = vector
+                # Stored as float16 to halve the on-disk footprint
+                self._cache.set(keys[i], vector.astype(np.float16).tobytes(), expire=ttl)
+        
+        return embeddings
+    
+    def _encode_batch(self, texts: List[str], normalize: bool, batch_size: int) -> np.ndarray:
+        """Run the transformer forward pass over a list of texts."""
         embeddings = self._model.encode(
-            text,
+            texts,
+            batch_size=batch_size,
             normalize_embeddings=normalize,
+            convert_to_numpy=True,
             show_progress_bar=False
         )
-        
-        return embeddings
+        # fp16 models emit float16; the Milvus vector field stays float32
+        return embeddings.astype(np.float32, copy=False)
     
-    def encode_single(self, text: str, normalize: bool = True) -> List[float]:
+    def encode_single(self, text: str, normalize: bool = True) -> np.ndarray:
         """
-        Generate embedding for a single text and return as list.
+        Generate embedding for a single text.
         
         Args:
             text: Text to encode
             normalize: Whether to L2-normalize
             
         Returns:
-            List of floats representing the embedding
+            float32 array of shape (dim,); pymilvus accepts it directly
         """
         embedding = self.encode(text, normalize=normalize)
         if len(embedding.shape) > 1:
             embedding = embedding[0]
-        return embedding.tolist()
+        return embedding.astype(np.float32, copy=False)
     
     def similarity(self, text1: str, text2: str) -> float:
         """
@@ -4,16 +4,22 @@
 
 import os
 import time
-from pathlib import Path
-from typing import Callable, Optional, Set
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from loguru import logger
 from threading import Thread
-import queue
+import heapq
+import threading
 
 from config import get_settings
 
+try:
+    # Kernel inotify events on Linux, without the generic platform selection
+    from watchdog.observers.inotify import InotifyObserver
+except ImportError:
+    InotifyObserver = None
+
 
 class DocumentEventHandler(FileSystemEventHandler):
     """
@@ -28,40 +34,61 @@ class DocumentEventHandler(FileSystemEventHandler):
     ):
         super().__init__()
         self.on_file_ready = on_file_ready
-        self.supported_extensions = supported_extensions
-        self._pending_files: queue.Queue = queue.Queue()
+        self.supported_extensions = frozenset(e.lower() for e in supported_extensions)
+        self._ext_tuple = tuple(self.supported_extensions)
         self._debounce_seconds = 2.0
         
+        # Debounce timers: heap of (deadline, path) plus the latest deadline per
+        # path; a newer event for a path supersedes its older heap entry
+        self._cv = threading.Condition()
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        
         self._processor_thread = Thread(target=self._process_pending, daemon=True)
         self._processor_thread.start()
     
     def _is_supported(self, path: str) -> bool:
-        ext = Path(path).suffix.lower()
-        return ext in self.supported_extensions
+        # Called for every FS event: one C-level suffix check, no Path parsing
+        return path.lower().endswith(self._ext_tuple)
+    
+    def _schedule(self, path: str):
+        """(Re)start the debounce timer for a path and wake the worker."""
+        deadline = time.monotonic() + self._debounce_seconds
+        with self._cv:
+            self._deadlines[path] = deadline
+            heapq.heappush(self._heap, (deadline, path))
+            self._cv.notify()
+    
+    def _next_ready(self) -> str:
+        """Block until a path's debounce timer expires, then return it."""
+        with self._cv:
+            while True:
+                if not self._heap:
+                    self._cv.wait()
+                    continue
+                
+                deadline, path = self._heap[0]
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    # Wakes early if a new event arrives
+                    self._cv.wait(timeout=timeout)
+                    continue
+                
+                heapq.heappop(self._heap)
+                if self._deadlines.get(path) != deadline:
+                    continue  # Superseded by a later event for the same path
+                del self._deadlines[path]
+                return path
     
     def _process_pending(self):
-        pending: dict = {}
-        
         while True:
             try:
-                try:
-                    path = self._pending_files.get_nowait()
-                    pending[path] = time.time()
-                except queue.Empty:
-                    pass
-                
-                now = time.time()
-                ready = [p for p, t in pending.items() if now - t >= self._debounce_seconds]
-                
-                for path in ready:
-                    del pending[path]
-                    if os.path.exists(path):
-                        try:
-                            self.on_file_ready(path)
-                        except Exception as e:
-                            logger.error(f"Error processing {path}: {e}")
-                
-                time.sleep(0.5)
+                path = self._next_ready()
+                if os.path.exists(path):
+                    try:
+                        self.on_file_ready(path)
+                    except Exception as e:
+                        logger.error(f"Error processing {path}: {e}")
             except Exception as e:
                 logger.error(f"Pending processor error: {e}")
                 time.sleep(1)
@@ -71,13 +98,13 @@ class DocumentEventHandler(FileSystemEventHandler):
             return
         if self._is_supported(event.src_path):
             logger.info(f"File created: {event.src_path}")
-            self._pending_files.put(event.src_path)
+            self._schedule(event.src_path)
     
     def on_modified(self, event: FileSystemEvent):
         if event.is_directory:
             return
         if self._is_supported(event.src_path):
-            self._pending_files.put(event.src_path)
+            self._schedule(event.src_path)
     
     def on_deleted(self, event: FileSystemEvent):
         if event.is_directory:
@@ -90,7 +117,7 @@ class FileWatcher:
     def __init__(self, on_file_ready: Callable[[str], None]):
         self.settings = get_settings()
         self.on_file_ready = on_file_ready
-        self.supported_extensions = set(self.settings.supported_extensions)
+        self.supported_extensions = frozenset(e.lower() for e in self.settings.supported_extensions)
         self._observer: Optional[Observer] = None
         self._watching = False
     
@@ -106,12 +133,23 @@ class FileWatcher:
             supported_extensions=self.supported_extensions
         )
         
-        self._observer = Observer()
+        self._observer = self._make_observer()
         self._observer.schedule(handler, watch_path, recursive=True)
         self._observer.start()
         self._watching = True
         logger.info(f"Started watching: {watch_path}")
     
+    @staticmethod
+    def _make_observer() -> Observer:
+        """Inotify observer on Linux; watchdog's platform default elsewhere."""
+        if InotifyObserver is not None:
+            try:
+                # No paired close/move events: the handler only needs create/modify
+                return InotifyObserver(generate_full_events=False)
+            except Exception as e:
+                logger.warning(f"Inotify unavailable ({e}), using default observer")
+        return Observer()
+    
     def stop(self):
         if self._observer:
             self._observer.stop()
@@ -124,17 +162,51 @@ class FileWatcher:
     def is_watching(self) -> bool:
         return self._watching
     
-    def scan_existing(self, path: Optional[str] = None) -> int:
-        scan_path = Path(path or self.settings.documents_path)
+    def _iter_supported_files(self, root: str) -> Iterator[str]:
+        """Yield supported files under root in a single os.scandir walk."""
+        try:
+            entries = os.scandir(root)
+        except OSError as e:
+            logger.error(f"Cannot scan {root}: {e}")
+            return
         
-        if not scan_path.exists():
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_supported_files(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in self.supported_extensions:
+                    yield entry.path
+    
+    def scan_existing(
+        self,
+        path: Optional[str] = None,
+        on_files_ready: Optional[Callable[[List[str]], None]] = None
+    ) -> int:
+        """
+        Queue all existing supported files for indexing.
+        
+        Args:
+            path: Directory to scan (default: documents path)
+            on_files_ready: Bulk callback receiving every file found at once,
+                so the caller can batch the whole initial load; when omitted,
+                on_file_ready is called per file
+            
+        Returns:
+            Number of files found
+        """
+        scan_path = path or self.settings.documents_path
+        
+        if not os.path.exists(scan_path):
             return 0
         
-        count = 0
-        for ext in self.supported_extensions:
-            for file_path in scan_path.rglob(f"*{ext}"):
-                self.on_file_ready(str(file_path))
-                count += 1
+        # One walk for all extensions (instead of one rglob pass per extension)
+        files = list(self._iter_supported_files(scan_path))
+        logger.info(f"Found {len(files)} existing files to index")
+        
+        if on_files_ready is not None:
+            on_files_ready(files)
+        else:
+            for file_path in files:
+                self.on_file_ready(file_path)
         
-        logger.info(f"Found {count} existing files to index")
-        return count
+        return len(files)
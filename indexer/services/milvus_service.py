@@ -10,14 +10,76 @@ from pymilvus import (
     DataType,
     utility
 )
-from typing import List, Dict, Optional, Any
+
+try:
+    # BM25 full-text search functions are only available from pymilvus 2.5
+    from pymilvus import Function, FunctionType
+except ImportError:
+    Function = FunctionType = None
+from typing import List, Dict, Optional, Any, Union
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from loguru import logger
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import numpy as np
+import queue
+import threading
 import time
 
 from config import get_settings
 
 
+def _escape_string(value: str) -> str:
+    """Escape a value for use inside a double-quoted Milvus expression string."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards so a term matches literally (before _escape_string)."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Milvus VARCHAR max_length counts UTF-8 bytes; leave headroom below 65535
+_MAX_TEXT_BYTES = 65000
+
+
+def _truncate_utf8(text: str, max_bytes: int = _MAX_TEXT_BYTES) -> str:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character."""
+    if len(text) * 4 <= max_bytes:
+        return text  # Can't exceed the limit even if every char takes 4 bytes
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", "ignore")
+
+
+def _to_columns(documents: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose row dictionaries into one list per field."""
+    if not documents:
+        return {}
+    return {key: [doc[key] for doc in documents] for key in documents[0]}
+
+
+# Fields returned by search and keyword_search
+_OUTPUT_FIELDS = (
+    "file_path", "file_name", "page_number", "total_pages",
+    "division", "text_content", "language", "created_at",
+    "is_first_page", "is_last_page"
+)
+
+
+@lru_cache(maxsize=64)
+def _division_expr(division: Optional[str]) -> Optional[str]:
+    """RBAC filter expression for a division (None when unfiltered)."""
+    if not division:
+        return None
+    return f'division == "{_escape_string(division)}"'
+
+
+# Vector field storage types: Milvus data type and matching numpy dtype
+VECTOR_TYPES = {
+    "float32": (DataType.FLOAT_VECTOR, np.float32),
+    "float16": (DataType.FLOAT16_VECTOR, np.float16),
+}
+
+
 @dataclass
 class SearchResult:
     """A single search result."""
@@ -37,6 +99,83 @@ class SearchResult:
     # Make the dataclass mutable so we can update scores
     def __post_init__(self):
         pass
+    
+    @cached_property
+    def text_lower(self) -> str:
+        """Lowercased text content, computed once per result for term matching."""
+        # Kept as str: bytes.lower() only folds ASCII (É would not match é), and
+        # str.lower() already takes an ASCII fast path for ASCII-only text.
+        return (self.text_content or "").lower()
+
+
+class _SearchBatcher:
+    """
+    Coalesces concurrent single-vector searches into batched RPCs.
+    
+    The first queued query opens a short window; every query arriving within
+    it with the same filter, limit and params goes out in one search_batch()
+    call, and each caller's future receives its own slice of the results.
+    The batcher thread only coalesces: the batched RPCs run concurrently on
+    a pool, so one division's slow search doesn't hold up the others.
+    """
+    
+    def __init__(self, service: "MilvusService", window: float, max_concurrency: int):
+        self._service = service
+        self._window = window
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="milvus-search"
+        )
+    
+    def submit(
+        self,
+        query_vector: Union[List[float], np.ndarray],
+        division_filter: Optional[str],
+        limit: int,
+        search_params: Optional[Dict]
+    ) -> Future:
+        future: Future = Future()
+        self._queue.put((query_vector, division_filter, limit, search_params, future))
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="milvus-search-batcher", daemon=True
+                )
+                self._thread.start()
+        return future
+    
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    pending.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            groups: Dict[Any, list] = {}
+            for item in pending:
+                key = (item[1], item[2], repr(item[3]))
+                groups.setdefault(key, []).append(item)
+            
+            for items in groups.values():
+                self._executor.submit(self._search_group, items)
+    
+    def _search_group(self, items: list):
+        _, division_filter, limit, search_params, _ = items[0]
+        try:
+            results = self._service.search_batch(
+                [item[0] for item in items], division_filter, limit, search_params
+            )
+        except Exception as e:
+            for item in items:
+                item[4].set_exception(e)
+        else:
+            for item, item_results in zip(items, results):
+                item[4].set_result(item_results)
 
 
 class MilvusService:
@@ -49,6 +188,26 @@ class MilvusService:
         self.settings = get_settings()
         self._collection: Optional[Collection] = None
         self._connected = False
+        self._vector_dtype = np.float32  # Set from the collection schema
+        self._has_text_lower = False
+        self._has_bm25 = False
+        self._index_type = "IVF_FLAT"
+        self._metric_type = "COSINE"
+        
+        # Debounced flushing: writes mark the collection dirty, a background
+        # thread flushes at most once per interval (or once enough writes pile up)
+        self._pending_writes = 0
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._flush_wakeup = threading.Event()
+        self._flusher_thread: Optional[threading.Thread] = None
+        
+        window = self.settings.milvus_search_batch_window_ms / 1000
+        self._search_batcher = (
+            _SearchBatcher(self, window, self.settings.milvus_search_concurrency)
+            if window > 0 else None
+        )
     
     def connect(self) -> bool:
         """Establish connection to Milvus."""
@@ -71,10 +230,52 @@ class MilvusService:
     def disconnect(self):
         """Close connection to Milvus."""
         if self._connected:
+            try:
+                self.flush_now()
+            except Exception as e:
+                logger.error(f"Final flush failed: {e}")
             connections.disconnect("default")
             self._connected = False
             logger.info("Disconnected from Milvus")
     
+    def _schedule_flush(self):
+        """Record a write; the background flusher will flush it shortly."""
+        with self._pending_lock:
+            self._pending_writes += 1
+            if self._flusher_thread is None:
+                self._flusher_thread = threading.Thread(
+                    target=self._flush_loop, name="milvus-flusher", daemon=True
+                )
+                self._flusher_thread.start()
+            if self._pending_writes >= self.settings.milvus_flush_max_pending:
+                self._flush_wakeup.set()
+        self._dirty.set()
+    
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            # Coalesce writes arriving during the debounce window
+            self._flush_wakeup.wait(timeout=self.settings.milvus_flush_interval)
+            self._flush_wakeup.clear()
+            try:
+                self.flush_now()
+            except Exception as e:
+                logger.error(f"Background flush failed: {e}")
+    
+    def flush_now(self):
+        """Flush pending writes immediately (used on shutdown)."""
+        with self._pending_lock:
+            pending = self._pending_writes
+            self._pending_writes = 0
+            self._dirty.clear()
+        
+        if not pending or self._collection is None:
+            return
+        
+        with self._flush_lock:
+            self._collection.flush()
+        logger.debug(f"Flushed {pending} pending write(s)")
+    
     def ensure_collection(self) -> Collection:
         """
         Ensure the collection exists, creating it if necessary.
@@ -95,8 +296,103 @@ class MilvusService:
             self._collection = self._create_collection(collection_name)
             logger.info(f"Created new collection: {collection_name}")
         
+        # Existing collections keep whatever schema they were created with
+        self._vector_dtype = np.float32
+        self._has_text_lower = False
+        self._has_bm25 = False
+        for field in self._collection.schema.fields:
+            if field.name == "vector" and field.dtype == DataType.FLOAT16_VECTOR:
+                self._vector_dtype = np.float16
+            elif field.name == "text_content_lower":
+                self._has_text_lower = True
+            elif field.name == "text_sparse":
+                self._has_bm25 = True
+        
+        self._index_type = "IVF_FLAT"
+        self._metric_type = "COSINE"
+        for index in self._collection.indexes:
+            if index.field_name == "vector":
+                self._index_type = index.params.get("index_type", "IVF_FLAT").upper()
+                self._metric_type = index.params.get("metric_type", "COSINE").upper()
+        
         return self._collection
     
+    def _to_vector_rows(self, vectors: Union[List[Any], np.ndarray]) -> List[Any]:
+        """
+        Convert vectors to what pymilvus expects for the collection's vector field.
+        
+        All rows are converted in one numpy pass: float32 fields take lists of
+        floats, float16 fields take float16 arrays, which pymilvus >= 2.4.4
+        serializes to bytes on insert and sends as float16 search queries
+        (older clients mis-encode them as float32 vectors).
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=self._vector_dtype)
+        if self._vector_dtype == np.float16:
+            return list(matrix)
+        return matrix.tolist()
+    
+    def _vector_field_type(self) -> DataType:
+        """Milvus data type for the vector field of new collections."""
+        vector_type = self.settings.milvus_vector_type
+        if vector_type not in VECTOR_TYPES:
+            logger.warning(f"Unknown vector type '{vector_type}', using float32")
+            vector_type = "float32"
+        return VECTOR_TYPES[vector_type][0]
+    
+    def _vector_index_params(self) -> Dict[str, Any]:
+        """
+        Vector index parameters for new collections.
+        
+        IP requires L2-normalized vectors, which the indexer always stores
+        (it embeds with normalize=True); it then ranks exactly like COSINE
+        without the per-distance norm computation.
+        """
+        index_type = self.settings.milvus_index_type.upper()
+        metric_type = self.settings.milvus_metric_type.upper()
+        if metric_type not in ("IP", "COSINE"):
+            logger.warning(f"Unknown metric type '{metric_type}', using COSINE")
+            metric_type = "COSINE"
+        
+        if index_type == "IVF_FLAT":
+            params = {"nlist": 1024}
+        elif index_type == "DISKANN":
+            params = {}  # SSD-resident graph for very large collections
+        else:
+            if index_type != "HNSW":
+                logger.warning(f"Unknown index type '{index_type}', using HNSW")
+                index_type = "HNSW"
+            params = {
+                "M": self.settings.milvus_hnsw_m,
+                "efConstruction": self.settings.milvus_hnsw_ef_construction
+            }
+        
+        return {"metric_type": metric_type, "index_type": index_type, "params": params}
+    
+    def _default_search_params(self, limit: int) -> Dict[str, Any]:
+        """
+        Search parameters matching the collection's vector index type.
+        
+        Graph indexes reject a candidate list shorter than the number of
+        results (k), so ef / search_list never go below limit.
+        """
+        candidates = max(self.settings.milvus_search_ef, limit)
+        if self._index_type == "HNSW":
+            params = {"ef": candidates}
+        elif self._index_type == "DISKANN":
+            params = {"search_list": candidates}
+        else:
+            params = {"nprobe": self.settings.milvus_search_nprobe}
+        return {"metric_type": self._metric_type, "params": params}
+    
+    def _bm25_enabled(self) -> bool:
+        """Whether new collections get a BM25 full-text field."""
+        if not self.settings.milvus_enable_bm25:
+            return False
+        if Function is None or not hasattr(FunctionType, "BM25"):
+            logger.warning("BM25 requested but pymilvus < 2.5 is installed; skipping")
+            return False
+        return True
+    
     def _create_collection(self, name: str) -> Collection:
         """
         Create a new collection with the required schema.
@@ -120,7 +416,7 @@ class MilvusService:
             # Vector field for semantic search
             FieldSchema(
                 name="vector",
-                dtype=DataType.FLOAT_VECTOR,
+                dtype=self._vector_field_type(),
                 dim=self.settings.embedding_dimension
             ),
             
@@ -152,11 +448,13 @@ class MilvusService:
                 dtype=DataType.BOOL
             ),
             
-            # Security / RBAC
+            # Security / RBAC; partition key so division filters only scan
+            # the partition the division hashes to
             FieldSchema(
                 name="division",
                 dtype=DataType.VARCHAR,
-                max_length=64
+                max_length=64,
+                is_partition_key=True
             ),
             FieldSchema(
                 name="user_id",
@@ -170,6 +468,12 @@ class MilvusService:
                 dtype=DataType.VARCHAR,
                 max_length=65535
             ),
+            # Lowercased copy for case-insensitive LIKE keyword matching
+            FieldSchema(
+                name="text_content_lower",
+                dtype=DataType.VARCHAR,
+                max_length=65535
+            ),
             
             # Additional metadata
             FieldSchema(
@@ -192,45 +496,126 @@ class MilvusService:
             ),
         ]
         
+        use_bm25 = self._bm25_enabled()
+        functions = []
+        if use_bm25:
+            # Milvus tokenizes text_content and fills the sparse field itself
+            text_field = next(f for f in fields if f.name == "text_content")
+            fields[fields.index(text_field)] = FieldSchema(
+                name="text_content",
+                dtype=DataType.VARCHAR,
+                max_length=65535,
+                enable_analyzer=True
+            )
+            fields.append(FieldSchema(
+                name="text_sparse",
+                dtype=DataType.SPARSE_FLOAT_VECTOR
+            ))
+            functions.append(Function(
+                name="text_bm25",
+                function_type=FunctionType.BM25,
+                input_field_names=["text_content"],
+                output_field_names=["text_sparse"]
+            ))
+        
         schema = CollectionSchema(
             fields=fields,
-            description="CENADI document search collection"
+            description="CENADI document search collection",
+            partition_key_field="division",
+            **({"functions": functions} if functions else {})
         )
         
-        collection = Collection(name=name, schema=schema)
+        collection = Collection(
+            name=name,
+            schema=schema,
+            num_partitions=self.settings.milvus_num_partitions
+        )
         
         # Create vector index for fast similarity search
-        index_params = {
-            "metric_type": "COSINE",
-            "index_type": "IVF_FLAT",
-            "params": {"nlist": 1024}
-        }
         collection.create_index(
             field_name="vector",
-            index_params=index_params
+            index_params=self._vector_index_params()
         )
+        if use_bm25:
+            collection.create_index(
+                field_name="text_sparse",
+                index_params={
+                    "metric_type": "BM25",
+                    "index_type": "SPARSE_INVERTED_INDEX",
+                    "params": {}
+                }
+            )
         
         collection.load()
         
         return collection
     
-    def insert_documents(self, documents: List[Dict[str, Any]]) -> int:
+    def insert_documents(
+        self,
+        documents: Union[List[Dict[str, Any]], Dict[str, List[Any]]],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> int:
         """
         Insert documents into the collection.
         
+        Data is sent column-oriented (one list per field), which pymilvus
+        serializes without transposing rows. Columns are split into batches
+        sent by a bounded pool of concurrent insert calls; the flush is
+        deferred to the background flusher.
+        
         Args:
-            documents: List of document dictionaries with all required fields
+            documents: Column dict {field: [values...]} (preferred) or a list of
+                row dictionaries; vectors may be lists of floats or numpy arrays
+                and must be L2-normalized (IP collections rely on it)
+            batch_size: Rows per insert call (default: settings.milvus_insert_batch_size)
+            max_concurrency: Max in-flight insert calls (default: settings.milvus_insert_concurrency)
             
         Returns:
             Number of documents inserted
         """
         collection = self.ensure_collection()
         
+        columns = dict(documents) if isinstance(documents, dict) else _to_columns(documents)
+        num_rows = len(columns.get("id", []))
+        if not num_rows:
+            return 0
+        
+        batch_size = batch_size or self.settings.milvus_insert_batch_size
+        max_concurrency = max_concurrency or self.settings.milvus_insert_concurrency
+        
+        # Convert all vectors in one C-level pass instead of per row
+        columns["vector"] = self._to_vector_rows(columns["vector"])
+        columns["text_content"] = [_truncate_utf8(text) for text in columns["text_content"]]
+        if self._has_text_lower and "text_content_lower" not in columns:
+            columns["text_content_lower"] = [
+                _truncate_utf8(text.lower()) for text in columns["text_content"]
+            ]
+        
+        # Column-based inserts take one list per schema field, in schema order
+        ordered = [
+            columns[field.name] for field in collection.schema.fields
+            if not field.auto_id and not getattr(field, "is_function_output", False)
+        ]
+        batches = [
+            [column[i:i + batch_size] for column in ordered]
+            for i in range(0, num_rows, batch_size)
+        ]
+        
         try:
-            result = collection.insert(documents)
-            collection.flush()
-            logger.info(f"Inserted {len(result.primary_keys)} documents")
-            return len(result.primary_keys)
+            if len(batches) == 1:
+                inserted = len(collection.insert(batches[0]).primary_keys)
+            else:
+                workers = min(max_concurrency, len(batches))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(collection.insert, batch) for batch in batches]
+                    inserted = sum(
+                        len(future.result().primary_keys) for future in as_completed(futures)
+                    )
+            
+            self._schedule_flush()
+            logger.info(f"Inserted {inserted} documents in {len(batches)} batch(es)")
+            return inserted
         except Exception as e:
             logger.error(f"Failed to insert documents: {e}")
             raise
@@ -251,16 +636,41 @@ class MilvusService:
         
         try:
             result = collection.delete(expr)
-            collection.flush()
+            self._schedule_flush()
             logger.info(f"Deleted documents matching: {file_path}")
             return result.delete_count if hasattr(result, 'delete_count') else 0
         except Exception as e:
             logger.error(f"Failed to delete documents: {e}")
             raise
     
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """
+        Delete records by primary key.
+        
+        Args:
+            ids: Record IDs
+            
+        Returns:
+            Number of deleted records
+        """
+        if not ids:
+            return 0
+        collection = self.ensure_collection()
+        
+        expr = "id in [" + ", ".join(f'"{_escape_string(id_)}"' for id_ in ids) + "]"
+        
+        try:
+            result = collection.delete(expr)
+            self._schedule_flush()
+            logger.info(f"Deleted {len(ids)} documents by id")
+            return result.delete_count if hasattr(result, 'delete_count') else 0
+        except Exception as e:
+            logger.error(f"Failed to delete documents: {e}")
+            raise
+    
     def search(
         self,
-        query_vector: List[float],
+        query_vector: Union[List[float], np.ndarray],
         division_filter: Optional[str] = None,
         limit: int = 20,
         search_params: Optional[Dict] = None
@@ -268,6 +678,9 @@ class MilvusService:
         """
         Perform vector similarity search.
         
+        Concurrent calls are coalesced by the search batcher into a single
+        search_batch() RPC (see milvus_search_batch_window_ms).
+        
         Args:
             query_vector: Query embedding
             division_filter: Optional division to filter by (RBAC)
@@ -277,38 +690,61 @@ class MilvusService:
         Returns:
             List of SearchResult objects
         """
+        if self._search_batcher is None:
+            return self.search_batch([query_vector], division_filter, limit, search_params)[0]
+        return self._search_batcher.submit(
+            query_vector, division_filter, limit, search_params
+        ).result()
+    
+    def search_batch(
+        self,
+        query_vectors: Union[List[List[float]], np.ndarray],
+        division_filter: Optional[str] = None,
+        limit: int = 20,
+        search_params: Optional[Dict] = None
+    ) -> List[List[SearchResult]]:
+        """
+        Perform vector similarity search for several queries in one RPC.
+        
+        Milvus shares the index traversal across the queries of a batch.
+        
+        Args:
+            query_vectors: Query embeddings (list of vectors or 2-D array)
+            division_filter: Optional division to filter by (RBAC)
+            limit: Maximum number of results per query
+            search_params: Optional search parameters
+            
+        Returns:
+            One list of SearchResult objects per query, in query order
+        """
         collection = self.ensure_collection()
         
-        # Build filter expression for RBAC
-        expr = None
-        if division_filter:
-            expr = f'division == "{division_filter}"'
+        # Build filter expression for RBAC; an equality on the partition key
+        # lets Milvus prune the search to that division's partition
+        expr = _division_expr(division_filter)
         
         # Default search params
         if search_params is None:
-            search_params = {"metric_type": "COSINE", "params": {"nprobe": 10}}
+            search_params = self._default_search_params(limit)
         
-        # Fields to return
-        output_fields = [
-            "file_path", "file_name", "page_number", "total_pages",
-            "division", "text_content", "language", "created_at",
-            "is_first_page", "is_last_page"
-        ]
+        # Normalize all queries in one vectorized pass (no-op for the already
+        # normalized embeddings, but keeps COSINE/IP scores right for any caller)
+        queries = np.array(query_vectors, dtype=np.float32, ndmin=2)
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
         
         try:
             results = collection.search(
-                data=[query_vector],
+                data=self._to_vector_rows(queries),
                 anns_field="vector",
                 param=search_params,
                 limit=limit,
                 expr=expr,
-                output_fields=output_fields
+                output_fields=list(_OUTPUT_FIELDS)
             )
             
-            search_results = []
-            for hits in results:
-                for hit in hits:
-                    search_results.append(SearchResult(
+            return [
+                [
+                    SearchResult(
                         id=hit.id,
                         score=hit.score,
                         file_path=hit.entity.get("file_path"),
@@ -321,9 +757,11 @@ class MilvusService:
                         created_at=hit.entity.get("created_at"),
                         is_first_page=hit.entity.get("is_first_page"),
                         is_last_page=hit.entity.get("is_last_page")
-                    ))
-            
-            return search_results
+                    )
+                    for hit in hits
+                ]
+                for hits in results
+            ]
             
         except Exception as e:
             logger.error(f"Search failed: {e}")
@@ -338,8 +776,11 @@ class MilvusService:
         """
         Perform keyword-based search using text matching.
         
-        Note: Milvus 2.4+ supports full-text search with BM25.
-        This is a simplified implementation using expression filters.
+        Collections with a BM25 field are searched with Milvus full-text
+        search, so results come back in relevance order. Otherwise matching
+        runs in Milvus as LIKE filters on the lowercased text field (any query
+        term matches); "%" and "_" inside a term are escaped and match
+        literally.
         
         Args:
             query: Search query string
@@ -351,69 +792,85 @@ class MilvusService:
         """
         collection = self.ensure_collection()
         
-        # Escape query for safety - keep original case for matching
-        safe_query = query.replace('"', '\\"').replace("'", "\\'")
+        query_terms = query.lower().split()
+        if not query_terms:
+            return []
         
         exprs = []
-        
-        # Try both original case and lowercase for better matching
-        # Milvus LIKE is case-sensitive, so we search for common patterns
         if division_filter:
-            exprs.append(f'division == "{division_filter}"')
+            exprs.append(_division_expr(division_filter))
         
-        expr = " and ".join(exprs) if exprs else None
-        
-        output_fields = [
-            "file_path", "file_name", "page_number", "total_pages",
-            "division", "text_content", "language", "created_at",
-            "is_first_page", "is_last_page"
-        ]
+        output_fields = list(_OUTPUT_FIELDS)
         
         try:
-            # First, try to get documents and filter in Python for case-insensitive matching
-            # This is more reliable than Milvus LIKE for case-insensitive search
-            if expr:
+            if self._has_bm25:
+                # BM25 ranks server-side; keep scores binary so downstream
+                # thresholds and boosts behave as before (order is preserved)
+                hits = collection.search(
+                    data=[query],
+                    anns_field="text_sparse",
+                    param={"metric_type": "BM25", "params": {}},
+                    limit=limit,
+                    expr=" and ".join(exprs) if exprs else None,
+                    output_fields=output_fields
+                )[0]
+                results = [
+                    {"id": hit.id, **{f: hit.entity.get(f) for f in output_fields}}
+                    for hit in hits
+                ]
+            elif self._has_text_lower:
+                # Milvus LIKE is case-sensitive, so match the lowercased copy of the
+                # text server-side and only transfer matching rows
+                exprs.append("(" + " or ".join(
+                    f'text_content_lower like "%{_escape_string(_escape_like(term))}%"'
+                    for term in query_terms
+                ) + ")")
                 results = collection.query(
-                    expr=expr,
+                    expr=" and ".join(exprs),
                     output_fields=output_fields,
-                    limit=limit * 10  # Get more to filter
+                    limit=limit
                 )
             else:
-                # No division filter - get all and filter
-                results = collection.query(
-                    expr="page_number >= 1",  # Get all documents
-                    output_fields=output_fields,
-                    limit=limit * 10
+                # Collections created before text_content_lower existed: page
+                # through candidates and filter case-insensitively in Python,
+                # stopping as soon as enough rows match
+                iterator = collection.query_iterator(
+                    batch_size=256,
+                    limit=limit * 10,  # Same scan budget as a single over-fetch
+                    expr=" and ".join(exprs) if exprs else "page_number >= 1",
+                    output_fields=output_fields
                 )
+                results = []
+                try:
+                    while len(results) < limit:
+                        batch = iterator.next()
+                        if not batch:
+                            break
+                        results.extend(
+                            item for item in batch
+                            if any(term in (item.get("text_content") or "").lower() for term in query_terms)
+                        )
+                finally:
+                    iterator.close()
+                del results[limit:]
             
-            # Case-insensitive filtering in Python
-            query_lower = query.lower()
-            query_terms = query_lower.split()
-            
-            search_results = []
-            for item in results:
-                text_content = item.get("text_content", "") or ""
-                text_lower = text_content.lower()
-                
-                # Check if any query term is in the text
-                if any(term in text_lower for term in query_terms):
-                    search_results.append(SearchResult(
-                        id=item.get("id", ""),
-                        score=1.0,  # Keyword matches are binary
-                        file_path=item.get("file_path"),
-                        file_name=item.get("file_name"),
-                        page_number=item.get("page_number"),
-                        total_pages=item.get("total_pages"),
-                        division=item.get("division"),
-                        text_content=text_content,
-                        language=item.get("language"),
-                        created_at=item.get("created_at"),
-                        is_first_page=item.get("is_first_page", False),
-                        is_last_page=item.get("is_last_page", False)
-                    ))
-                    
-                    if len(search_results) >= limit:
-                        break
+            search_results = [
+                SearchResult(
+                    id=item.get("id", ""),
+                    score=1.0,  # Keyword matches are binary
+                    file_path=item.get("file_path"),
+                    file_name=item.get("file_name"),
+                    page_number=item.get("page_number"),
+                    total_pages=item.get("total_pages"),
+                    division=item.get("division"),
+                    text_content=item.get("text_content", "") or "",
+                    language=item.get("language"),
+                    created_at=item.get("created_at"),
+                    is_first_page=item.get("is_first_page", False),
+                    is_last_page=item.get("is_last_page", False)
+                )
+                for item in results
+            ]
             
             logger.info(f"Keyword search for '{query}' found {len(search_results)} results")
             return search_results
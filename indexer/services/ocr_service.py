@@ -5,13 +5,68 @@
 import pytesseract
 from PIL import Image
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 from loguru import logger
+import numpy as np
 import io
+import os
+import tempfile
 
 from config import get_settings
 
 
+# LSTM engine, auto page segmentation
+TESSERACT_CONFIG = r'--oem 3 --psm 1'
+
+
+def _text_and_confidence(data: dict, indices: Iterable[int]) -> Tuple[str, float]:
+    """
+    Rebuild page text and average confidence from Tesseract image_to_data output.
+    
+    Words are joined with spaces, lines with newlines and paragraphs/blocks
+    with a blank line, matching image_to_string layout.
+    
+    Args:
+        data: image_to_data DICT output
+        indices: Entries of data belonging to the page
+        
+    Returns:
+        Tuple of (extracted_text, confidence_score)
+    """
+    confidences = []
+    lines: List[str] = []
+    words: List[str] = []
+    last_line = None
+    last_par = None
+    
+    for i in indices:
+        conf = data['conf'][i]
+        if conf != '-1' and str(conf).isdigit():
+            confidences.append(int(conf))
+        
+        word = (data['text'][i] or "").strip()
+        if not word:
+            continue
+        
+        par_key = (data['block_num'][i], data['par_num'][i])
+        line_key = par_key + (data['line_num'][i],)
+        if line_key != last_line:
+            if words:
+                lines.append(" ".join(words))
+                words = []
+            if last_par is not None and par_key != last_par:
+                lines.append("")
+            last_line = line_key
+            last_par = par_key
+        words.append(word)
+    
+    if words:
+        lines.append(" ".join(words))
+    
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return "\n".join(lines).strip(), avg_confidence / 100.0
+
+
 class OCRService:
     """
     Service for extracting text from images using Tesseract OCR.
@@ -49,37 +104,106 @@ class OCRService:
         lang = lang or self.languages
         
         try:
-            # Configure Tesseract
-            custom_config = r'--oem 3 --psm 1'  # LSTM engine, auto page segmentation
-            
-            # Get text with confidence data
+            # Single Tesseract run: text is rebuilt from the same word data
+            # used for confidence instead of a second image_to_string pass
             data = pytesseract.image_to_data(
                 image,
                 lang=lang,
-                config=custom_config,
+                config=TESSERACT_CONFIG,
                 output_type=pytesseract.Output.DICT
             )
+            return _text_and_confidence(data, range(len(data['text'])))
             
-            # Calculate average confidence
-            confidences = [
-                int(c) for c in data['conf'] 
-                if c != '-1' and str(c).isdigit()
-            ]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        except Exception as e:
+            logger.error(f"OCR extraction failed: {e}")
+            return "", 0.0
+    
+    def extract_text_from_array(
+        self,
+        pixels: np.ndarray,
+        lang: Optional[str] = None
+    ) -> Tuple[str, float]:
+        """
+        Extract text from a raw pixel array.
+        
+        Args:
+            pixels: uint8 array of shape (height, width) or (height, width, channels)
+            lang: Language code override (default: fra+eng)
             
-            # Extract text
-            text = pytesseract.image_to_string(
-                image,
+        Returns:
+            Tuple of (extracted_text, confidence_score)
+        """
+        lang = lang or self.languages
+        
+        try:
+            data = pytesseract.image_to_data(
+                pixels,
                 lang=lang,
-                config=custom_config
+                config=TESSERACT_CONFIG,
+                output_type=pytesseract.Output.DICT
             )
-            
-            return text.strip(), avg_confidence / 100.0
+            return _text_and_confidence(data, range(len(data['text'])))
             
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
             return "", 0.0
     
+    def batch_extract(
+        self,
+        images: List[Image.Image],
+        lang: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Extract text from several images in one Tesseract process.
+        
+        The images are written as one multi-page TIFF so the process start-up
+        and language model load are paid once for the whole batch.
+        
+        Args:
+            images: PIL Images (one per page)
+            lang: Language code override (default: fra+eng)
+            
+        Returns:
+            List of (extracted_text, confidence_score), one per image
+        """
+        if not images:
+            return []
+        if len(images) == 1:
+            return [self.extract_text_from_image(images[0], lang)]
+        
+        lang = lang or self.languages
+        
+        tiff_path = None
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".tif", delete=False) as tmp:
+                tiff_path = tmp.name
+                images[0].save(tmp, format="TIFF", save_all=True, append_images=images[1:])
+            
+            data = pytesseract.image_to_data(
+                tiff_path,
+                lang=lang,
+                config=TESSERACT_CONFIG,
+                output_type=pytesseract.Output.DICT
+            )
+            
+            # Group word entries by page (page_num is 1-indexed)
+            page_indices: List[List[int]] = [[] for _ in images]
+            for i, page_num in enumerate(data['page_num']):
+                if 1 <= int(page_num) <= len(images):
+                    page_indices[int(page_num) - 1].append(i)
+            
+            return [_text_and_confidence(data, indices) for indices in page_indices]
+            
+        except Exception as e:
+            logger.error(f"Batch OCR extraction failed: {e}")
+            return [("", 0.0) for _ in images]
+        finally:
+            if tiff_path:
+                try:
+                    os.unlink(tiff_path)
+                except OSError:
+                    pass
+    
     def extract_text_from_file(
         self,
         file_path: str,
@@ -148,6 +272,34 @@ class OCRService:
         # This can be enhanced with more sophisticated preprocessing
         
         return image
+    
+    def preprocess_array(self, pixels: np.ndarray) -> np.ndarray:
+        """
+        Binarize a pixel array with Otsu's threshold.
+        
+        Args:
+            pixels: uint8 array, grayscale (H, W) or color (H, W, C)
+            
+        Returns:
+            Binarized uint8 grayscale array (0 or 255)
+        """
+        # Convert to grayscale (ITU-R 601 luma, like PIL's 'L' mode)
+        if pixels.ndim == 3:
+            gray = pixels[..., :3] @ np.array([0.299, 0.587, 0.114])
+            pixels = gray.astype(np.uint8)
+        
+        # Otsu: pick the threshold maximizing between-class variance,
+        # computed for all 256 levels at once from the histogram
+        hist = np.bincount(pixels.ravel(), minlength=256) / pixels.size
+        weight = np.cumsum(hist)
+        mean = np.cumsum(hist * np.arange(256))
+        spread = weight * (1.0 - weight)
+        valid = spread > 1e-12  # Both classes non-empty
+        variance = np.zeros(256)
+        variance[valid] = (mean[-1] * weight[valid] - mean[valid]) ** 2 / spread[valid]
+        threshold = int(np.argmax(variance))
+        
+        return np.where(pixels > threshold, 255, 0).astype(np.uint8)
 
 
 # Global instance
@@ -4,15 +4,23 @@
 
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterator, Optional, Tuple
 from dataclasses import dataclass
 from loguru import logger
-from PIL import Image
-import io
+import numpy as np
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
 
 from services.ocr_service import ocr_service
 from config import get_settings
 
+# PyMuPDF is not thread-safe, and several documents are indexed at once
+# (request threads, the file watcher): every fitz call in this process goes
+# through this lock. Only Tesseract OCR runs in parallel.
+_fitz_lock = threading.RLock()
+
 
 @dataclass
 class PageContent:
@@ -50,11 +58,19 @@ class PDFProcessor:
         self.settings = get_settings()
         self.ocr_dpi = self.settings.ocr_dpi
         self.min_text_length = 50  # Minimum chars to consider page as digital
+        
+        # Open documents reused across get_page_image calls, keyed by (path, mtime)
+        self._doc_cache: "OrderedDict[Tuple[str, float], fitz.Document]" = OrderedDict()
+        self._doc_cache_lock = threading.Lock()
+        self._doc_cache_size = 32
     
     def process_pdf(self, file_path: str) -> Optional[DocumentContent]:
         """
         Process a PDF file and extract text from all pages.
         
+        Collects iter_pages() into a DocumentContent; callers that can handle
+        pages incrementally should use iter_pages() directly.
+        
         Args:
             file_path: Path to the PDF file
             
@@ -63,29 +79,12 @@ class PDFProcessor:
         """
         path = Path(file_path)
         
-        if not path.exists():
-            logger.error(f"PDF file not found: {file_path}")
-            return None
-        
-        if not path.suffix.lower() == '.pdf':
-            logger.error(f"Not a PDF file: {file_path}")
+        if not self._is_pdf(path):
             return None
         
         try:
-            doc = fitz.open(file_path)
-            pages: List[PageContent] = []
-            scanned_count = 0
-            
-            logger.info(f"Processing PDF: {path.name} ({doc.page_count} pages)")
-            
-            for page_num in range(doc.page_count):
-                page_content = self._process_page(doc, page_num)
-                pages.append(page_content)
-                
-                if page_content.is_scanned:
-                    scanned_count += 1
-            
-            doc.close()
+            pages = list(self.iter_pages(file_path))
+            scanned_count = sum(1 for page in pages if page.is_scanned)
             
             is_mostly_scanned = scanned_count > (len(pages) / 2)
             
@@ -110,29 +109,143 @@ class PDFProcessor:
             logger.error(f"Failed to process PDF {file_path}: {e}")
             return None
     
-    def _process_page(self, doc: fitz.Document, page_num: int) -> PageContent:
+    def iter_pages(self, file_path: str) -> Iterator[PageContent]:
+        """
+        Extract the pages of a PDF one at a time, in page order.
+        
+        OCR of the next pages overlaps with the caller consuming earlier ones.
+        At most 2 x ocr_workers pages are held at once, so memory does not
+        grow with the length of the document.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Yields:
+            PageContent for each page
+        """
+        with _fitz_lock:
+            doc = fitz.open(file_path)
+            page_count = doc.page_count
+        try:
+            logger.info(f"Processing PDF: {os.path.basename(file_path)} ({page_count} pages)")
+            
+            # Text extraction and rendering stay on this thread under the fitz
+            # lock, Tesseract OCR (a subprocess) runs on the pool. The
+            # semaphore bounds how many rendered page images wait for OCR.
+            workers = max(1, self.ocr_workers)
+            window = workers * 2
+            in_flight = threading.BoundedSemaphore(window)
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending: "deque[Future]" = deque()
+                for page_num in range(page_count):
+                    pending.append(self._process_page(doc, page_num, executor, in_flight))
+                    while pending and (len(pending) > window or pending[0].done()):
+                        yield pending.popleft().result()
+                
+                while pending:
+                    yield pending.popleft().result()
+        finally:
+            with _fitz_lock:
+                doc.close()
+    
+    @property
+    def ocr_workers(self) -> int:
+        """
+        OCR threads per document.
+        
+        Up to max_concurrent_indexing documents are extracted at once, so by
+        default each gets an equal share of the cores instead of a full set.
+        """
+        if self.settings.ocr_workers > 0:
+            return self.settings.ocr_workers
+        return (os.cpu_count() or 2) // max(1, self.settings.max_concurrent_indexing)
+    
+    def page_count(self, file_path: str) -> int:
+        """
+        Number of pages in a PDF, or 0 if it is missing, not a PDF or unreadable.
+        """
+        if not self._is_pdf(Path(file_path)):
+            return 0
+        try:
+            with _fitz_lock, fitz.open(file_path) as doc:
+                return doc.page_count
+        except Exception as e:
+            logger.error(f"Failed to open PDF {file_path}: {e}")
+            return 0
+    
+    def _is_pdf(self, path: Path) -> bool:
+        """Check that path exists and has a .pdf extension, logging why not."""
+        if not path.exists():
+            logger.error(f"PDF file not found: {path}")
+            return False
+        
+        if not path.suffix.lower() == '.pdf':
+            logger.error(f"Not a PDF file: {path}")
+            return False
+        
+        return True
+    
+    def _process_page(
+        self,
+        doc: fitz.Document,
+        page_num: int,
+        executor: ThreadPoolExecutor,
+        in_flight: threading.BoundedSemaphore
+    ) -> Future:
         """
         Process a single page of a PDF.
         
+        Digital pages are resolved immediately; scanned pages are rendered here
+        and OCR'd on the executor.
+        
         Args:
             doc: PyMuPDF document object
             page_num: Page number (0-indexed)
+            executor: Pool running OCR
+            in_flight: Limits rendered pages waiting for OCR
             
         Returns:
-            PageContent object
+            Future resolving to a PageContent object
         """
-        page = doc.load_page(page_num)
+        # Try to extract text directly first (the page is also freed under the lock)
+        with _fitz_lock:
+            text = doc.load_page(page_num).get_text("text").strip()
         
-        # Try to extract text directly first
-        text = page.get_text("text").strip()
-        is_scanned = False
-        confidence = 1.0
+        if len(text) >= self.min_text_length:
+            future = Future()
+            future.set_result(self._page_content(page_num, text, False, 1.0))
+            return future
         
         # If no meaningful text, use OCR
-        if len(text) < self.min_text_length:
-            is_scanned = True
-            text, confidence = self._ocr_page(page)
+        in_flight.acquire()
+        try:
+            with _fitz_lock:
+                image = self._render_page(doc.load_page(page_num))
+        except Exception as e:
+            in_flight.release()
+            logger.error(f"OCR failed for page: {e}")
+            future = Future()
+            future.set_result(self._page_content(page_num, "", True, 0.0))
+            return future
+        
+        def ocr_task() -> PageContent:
+            try:
+                ocr_text, confidence = self._ocr_image(image)
+                return self._page_content(page_num, ocr_text, True, confidence)
+            finally:
+                in_flight.release()
         
+        return executor.submit(ocr_task)
+    
+    def _page_content(
+        self,
+        page_num: int,
+        text: str,
+        is_scanned: bool,
+        confidence: float
+    ) -> PageContent:
+        """Build the PageContent for a 0-indexed page."""
         # Count words
         word_count = len(text.split()) if text else 0
         
@@ -144,30 +257,38 @@ class PDFProcessor:
             word_count=word_count
         )
     
-    def _ocr_page(self, page: fitz.Page) -> Tuple[str, float]:
+    def _render_page(self, page: fitz.Page) -> np.ndarray:
         """
-        Apply OCR to a PDF page.
+        Render a PDF page as a pixel array for OCR.
         
         Args:
             page: PyMuPDF page object
             
+        Returns:
+            uint8 array (height, width) of the page at the OCR resolution
+        """
+        mat = fitz.Matrix(self.ocr_dpi / 72, self.ocr_dpi / 72)
+        # Tesseract works on grayscale anyway: render 1 byte/pixel instead of 3
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+        
+        # View the raw samples as an array (no PNG or PIL round-trip)
+        pixels = np.frombuffer(pix.samples, dtype=np.uint8)
+        if pix.n == 1:
+            return pixels.reshape(pix.height, pix.width)
+        return pixels.reshape(pix.height, pix.width, pix.n)
+    
+    def _ocr_image(self, pixels: np.ndarray) -> Tuple[str, float]:
+        """
+        Apply OCR to a rendered page.
+        
+        Args:
+            pixels: Pixel array of the page
+            
         Returns:
             Tuple of (extracted_text, confidence)
         """
         try:
-            # Render page as image
-            mat = fitz.Matrix(self.ocr_dpi / 72, self.ocr_dpi / 72)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PIL Image
-            img_bytes = pix.tobytes("png")
-            image = Image.open(io.BytesIO(img_bytes))
-            
-            # Apply OCR
-            text, confidence = ocr_service.extract_text_from_image(image)
-            
-            return text, confidence
-            
+            return ocr_service.extract_text_from_array(pixels)
         except Exception as e:
             logger.error(f"OCR failed for page: {e}")
             return "", 0.0
@@ -190,25 +311,48 @@ class PDFProcessor:
             PNG image bytes or None
         """
         try:
-            doc = fitz.open(file_path)
-            
-            if page_num < 1 or page_num > doc.page_count:
-                logger.error(f"Invalid page number: {page_num}")
-                doc.close()
-                return None
-            
-            page = doc.load_page(page_num - 1)  # 0-indexed
-            mat = fitz.Matrix(dpi / 72, dpi / 72)
-            pix = page.get_pixmap(matrix=mat)
-            
-            img_bytes = pix.tobytes("png")
-            doc.close()
-            
-            return img_bytes
+            # Cache lock for the handle cache, fitz lock for rendering
+            with self._doc_cache_lock, _fitz_lock:
+                doc = self._get_doc(file_path)
+                
+                if page_num < 1 or page_num > doc.page_count:
+                    logger.error(f"Invalid page number: {page_num}")
+                    return None
+                
+                page = doc.load_page(page_num - 1)  # 0-indexed
+                mat = fitz.Matrix(dpi / 72, dpi / 72)
+                pix = page.get_pixmap(matrix=mat)
+                
+                return pix.tobytes("png")
             
         except Exception as e:
             logger.error(f"Failed to render page image: {e}")
             return None
+    
+    def _get_doc(self, file_path: str) -> fitz.Document:
+        """
+        Return an open document for file_path, reusing a cached handle.
+        
+        Must be called with _doc_cache_lock held. A changed mtime reopens the
+        file; the least recently used handle is closed beyond the cache size.
+        """
+        key = (file_path, os.stat(file_path).st_mtime)
+        
+        doc = self._doc_cache.get(key)
+        if doc is not None:
+            self._doc_cache.move_to_end(key)
+            return doc
+        
+        # Drop stale handles for this path, then make room
+        for stale in [k for k in self._doc_cache if k[0] == file_path]:
+            self._doc_cache.pop(stale).close()
+        while len(self._doc_cache) >= self._doc_cache_size:
+            _, evicted = self._doc_cache.popitem(last=False)
+            evicted.close()
+        
+        doc = fitz.open(file_path)
+        self._doc_cache[key] = doc
+        return doc
 
 
 # Global instance
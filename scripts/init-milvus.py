@@ -4,8 +4,13 @@ Milvus Collection Initialization Script
 Creates the document collection with proper schema if it doesn't exist.
 """
 
+import argparse
+import json
+import math
+import os
 import sys
 import time
+import numpy as np
 from pymilvus import (
     connections,
     utility,
@@ -14,6 +19,7 @@ from pymilvus import (
     CollectionSchema,
     DataType
 )
+from pymilvus.client.types import LoadState
 
 # Configuration
 MILVUS_HOST = "localhost"
@@ -21,29 +27,163 @@ MILVUS_PORT = "19530"
 COLLECTION_NAME = "documents"
 EMBEDDING_DIM = 384  # paraphrase-multilingual-MiniLM-L12-v2
 
+# Vector storage type: float16 halves storage and insert bandwidth (same knob as the indexer)
+VECTOR_TYPE = os.getenv("MILVUS_VECTOR_TYPE", "float32").lower()
+VECTOR_DTYPES = {
+    "float32": DataType.FLOAT_VECTOR,
+    "float16": DataType.FLOAT16_VECTOR,
+}
 
-def wait_for_milvus(max_retries: int = 30, delay: int = 2):
-    """Wait for Milvus to be ready."""
+# Vector index: HNSW by default; MILVUS_INDEX_TYPE=IVF_FLAT, IVF_PQ or SCANN for IVF deployments
+INDEX_TYPE = os.getenv("MILVUS_INDEX_TYPE", "HNSW").upper()
+IVF_INDEX_TYPES = ("IVF_FLAT", "IVF_PQ", "SCANN")  # Index types sized by nlist
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_SEARCH_EF = 96  # Search-time candidate list: pass {"params": {"ef": HNSW_SEARCH_EF}}
+
+# Embeddings are L2-normalized, so inner product ranks like cosine without
+# the norm computation per distance; MILVUS_METRIC_TYPE=COSINE to opt out
+METRIC_TYPE = os.getenv("MILVUS_METRIC_TYPE", "IP").upper()
+
+# IVF list count: MILVUS_NLIST overrides the size-based default
+MILVUS_NLIST = int(os.getenv("MILVUS_NLIST", "0"))
+
+# IVF_PQ: each vector becomes PQ_M codes of PQ_NBITS bits (8 bytes with the
+# defaults instead of 768/1536); PQ_M must divide EMBEDDING_DIM
+PQ_M = int(os.getenv("MILVUS_PQ_M", "8"))
+PQ_NBITS = int(os.getenv("MILVUS_PQ_NBITS", "8"))
+
+# Give up waiting for the collection to load after this many seconds
+LOAD_TIMEOUT = float(os.getenv("MILVUS_LOAD_TIMEOUT", "600"))
+
+
+def compute_nlist(num_vectors: int) -> int:
+    """IVF list count for a collection of num_vectors (~sqrt(N), at least 128)."""
+    if MILVUS_NLIST > 0:
+        return MILVUS_NLIST
+    return max(128, int(4 * math.sqrt(num_vectors)))
+
+
+def compute_nprobe(nlist: int) -> int:
+    """Default lists probed per search, scaled with nlist to preserve recall."""
+    return max(8, nlist // 32)
+
+
+def vector_index_params(num_vectors: int = 0) -> dict:
+    """Vector index parameters for INDEX_TYPE, sized for num_vectors."""
+    if INDEX_TYPE == "IVF_FLAT":
+        params = {"nlist": compute_nlist(num_vectors)}
+    elif INDEX_TYPE == "IVF_PQ":
+        if EMBEDDING_DIM % PQ_M:
+            raise ValueError(f"MILVUS_PQ_M={PQ_M} must divide the dimension {EMBEDDING_DIM}")
+        params = {"nlist": compute_nlist(num_vectors), "m": PQ_M, "nbits": PQ_NBITS}
+    elif INDEX_TYPE == "SCANN":
+        # Quantized IVF whose candidates are re-ranked on the raw vectors:
+        # recovers most of the recall PQ loses (Milvus has no OPQ rotation)
+        if VECTOR_TYPE != "float32":
+            raise ValueError("SCANN needs MILVUS_VECTOR_TYPE=float32")
+        params = {"nlist": compute_nlist(num_vectors), "with_raw_data": True}
+    else:
+        return {
+            "metric_type": METRIC_TYPE,
+            "index_type": "HNSW",
+            "params": {"M": HNSW_M, "efConstruction": HNSW_EF_CONSTRUCTION}
+        }
+    return {"metric_type": METRIC_TYPE, "index_type": INDEX_TYPE, "params": params}
+
+
+def wait_for_milvus(max_wait: float = 30.0, connect_timeout: float = 3.0):
+    """Wait for Milvus to be ready, retrying with exponential backoff."""
     print("Waiting for Milvus to be ready...")
     
-    for i in range(max_retries):
+    deadline = time.monotonic() + max_wait
+    attempt = 0
+    while True:
+        attempt += 1
         try:
             connections.connect(
                 alias="default",
                 host=MILVUS_HOST,
-                port=MILVUS_PORT
+                port=MILVUS_PORT,
+                timeout=connect_timeout
             )
-            print("✓ Connected to Milvus")
+            # Round-trip to the server: a cached connection alone proves nothing
+            version = utility.get_server_version()
+            print(f"✓ Connected to Milvus {version}")
             return True
         except Exception as e:
-            print(f"  Attempt {i+1}/{max_retries}: {e}")
-            time.sleep(delay)
+            print(f"  Attempt {attempt}: {e}")
+            connections.disconnect("default")
+        
+        delay = min(10.0, 0.2 * (2 ** (attempt - 1)))
+        if time.monotonic() + delay > deadline:
+            break
+        time.sleep(delay)
     
     print("✗ Failed to connect to Milvus")
     return False
 
 
-def create_collection():
+def load_collection(collection: Collection, poll_interval: float = 2.0, timeout: float = LOAD_TIMEOUT):
+    """
+    Load the collection into memory, reporting progress.
+    
+    Empty collections are loaded too: Milvus rejects searches on a
+    collection that was never loaded. Raises TimeoutError if loading
+    hasn't finished within timeout seconds.
+    """
+    if utility.load_state(collection.name) == LoadState.Loaded:
+        print("✓ Collection already loaded")
+        return
+    
+    print("Loading collection into memory...")
+    collection.load(_async=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = utility.loading_progress(collection.name).get("loading_progress", "0%")
+        print(f"  Loading: {progress}")
+        if str(progress).rstrip("%") == "100":
+            break
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Collection still loading after {timeout:.0f}s ({progress})")
+        time.sleep(poll_interval)
+    print("✓ Collection loaded and ready")
+    
+    if collection.num_entities:
+        warm_up(collection)
+
+
+def warm_up(collection: Collection):
+    """Run one throwaway search so the first real query doesn't fault in the index."""
+    vector = np.random.rand(EMBEDDING_DIM)
+    vector /= np.linalg.norm(vector)
+    
+    # Encode the query for the field's actual type: the collection may predate
+    # the current MILVUS_VECTOR_TYPE
+    field = next(f for f in collection.schema.fields if f.name == "embedding")
+    if field.dtype == DataType.FLOAT16_VECTOR:
+        data = [vector.astype(np.float16)]  # Float16Vector placeholder (pymilvus >= 2.4.4)
+    else:
+        data = [vector.astype(np.float32).tolist()]
+    
+    if INDEX_TYPE in IVF_INDEX_TYPES:
+        search_params = {"nprobe": compute_nprobe(compute_nlist(collection.num_entities))}
+    else:
+        search_params = {"ef": HNSW_SEARCH_EF}
+    
+    try:
+        collection.search(
+            data,
+            anns_field="embedding",
+            param={"metric_type": METRIC_TYPE, "params": search_params},
+            limit=1
+        )
+        print("✓ Warm-up search done")
+    except Exception as e:
+        print(f"⚠ Warning: warm-up search failed: {e}", file=sys.stderr)
+
+
+def create_collection(load: bool = True):
     """Create the documents collection with proper schema."""
     
     # Check if collection already exists
@@ -51,6 +191,7 @@ def create_collection():
         print(f"Collection '{COLLECTION_NAME}' already exists")
         collection = Collection(COLLECTION_NAME)
         print(f"  - Entities: {collection.num_entities}")
+        rebuild_ivf_index(collection, load)
         return collection
     
     print(f"Creating collection '{COLLECTION_NAME}'...")
@@ -60,13 +201,13 @@ def create_collection():
         FieldSchema(
             name="id",
             dtype=DataType.VARCHAR,
-            max_length=512,
+            max_length=64,  # Page IDs are 32 hex chars
             is_primary=True,
             description="Unique document chunk ID"
         ),
         FieldSchema(
             name="embedding",
-            dtype=DataType.FLOAT_VECTOR,
+            dtype=VECTOR_DTYPES.get(VECTOR_TYPE, DataType.FLOAT_VECTOR),
             dim=EMBEDDING_DIM,
             description="Text embedding vector"
         ),
@@ -149,14 +290,16 @@ def create_collection():
     schema = CollectionSchema(
         fields=fields,
         description="Document search collection with semantic embeddings",
-        enable_dynamic_field=True
+        enable_dynamic_field=False  # All fields are declared: no per-row $meta JSON
     )
     
     # Create collection
     collection = Collection(
         name=COLLECTION_NAME,
         schema=schema,
-        consistency_level="Strong"
+        # Searches may lag inserts by a moment; callers needing read-after-write
+        # can pass consistency_level="Strong" per search
+        consistency_level="Bounded"
     )
     
     print(f"✓ Collection '{COLLECTION_NAME}' created")
@@ -164,28 +307,35 @@ def create_collection():
     # Create indexes
     print("Creating indexes...")
     
-    # Vector index for similarity search (IVF_FLAT for balanced performance)
-    vector_index_params = {
-        "metric_type": "COSINE",
-        "index_type": "IVF_FLAT",
-        "params": {"nlist": 128}
-    }
+    # Vector index for similarity search (HNSW graph; IVF on request).
+    # Milvus trains IVF centroids / PQ codebooks per sealed segment, on the
+    # inserted data, so declaring the index on the empty collection is fine.
+    index_params = vector_index_params()
     collection.create_index(
         field_name="embedding",
-        index_params=vector_index_params,
+        index_params=index_params,
         index_name="embedding_idx"
     )
-    print("  ✓ Vector index created")
+    print(f"  ✓ Vector index created ({index_params['index_type']})")
     
-    # Scalar indexes for filtering
+    # Scalar indexes for filtering: INVERTED maps each value straight to its
+    # rows for equality filters; file_name keeps the default trie, which
+    # also serves prefix LIKE "name%" queries
     collection.create_index(
         field_name="division",
+        index_params={"index_type": "INVERTED"},
         index_name="division_idx"
     )
     collection.create_index(
         field_name="file_type",
+        index_params={"index_type": "INVERTED"},
         index_name="file_type_idx"
     )
+    collection.create_index(
+        field_name="ocr_applied",
+        index_params={"index_type": "INVERTED"},
+        index_name="ocr_applied_idx"
+    )
     collection.create_index(
         field_name="file_name",
         index_name="file_name_idx"
@@ -193,15 +343,60 @@ def create_collection():
     print("  ✓ Scalar indexes created")
     
     # Load collection into memory
-    print("Loading collection into memory...")
-    collection.load()
-    print("✓ Collection loaded and ready")
+    if load:
+        load_collection(collection)
     
     return collection
 
 
+def rebuild_ivf_index(collection: Collection, load: bool = True):
+    """
+    Rebuild an IVF index whose nlist is far below what the data now needs.
+    
+    Collections are created empty, so their IVF index starts at the minimum
+    nlist; run this script again after reindex-all.py to resize it.
+    """
+    for index in collection.indexes:
+        if index.field_name != "embedding":
+            continue
+        
+        params = index.params
+        if params.get("index_type") != INDEX_TYPE or INDEX_TYPE not in IVF_INDEX_TYPES:
+            return
+        
+        index_params = params.get("params", {})
+        if isinstance(index_params, str):
+            index_params = json.loads(index_params)
+        current = int(index_params.get("nlist", 0))
+        new_params = vector_index_params(collection.num_entities)
+        target = new_params["params"]["nlist"]
+        if current * 2 > target:
+            return
+        
+        print(f"Rebuilding {INDEX_TYPE} index: nlist {current} -> {target}")
+        collection.release()
+        collection.drop_index(index_name=index.index_name)
+        collection.create_index(
+            field_name="embedding",
+            index_params=new_params,
+            index_name=index.index_name
+        )
+        print(f"  ✓ Vector index rebuilt (search with nprobe={compute_nprobe(target)})")
+        if load:
+            load_collection(collection)
+        return
+
+
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Initialize the Milvus collection")
+    parser.add_argument(
+        "--no-load",
+        action="store_true",
+        help="Do not load the collection into memory"
+    )
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("Milvus Collection Initialization")
     print("=" * 50)
@@ -212,13 +407,13 @@ def main():
     
     # Create collection
     try:
-        collection = create_collection()
+        collection = create_collection(load=not args.no_load)
         
         print("\n" + "=" * 50)
         print("Initialization Complete")
         print("=" * 50)
         print(f"Collection: {COLLECTION_NAME}")
-        print(f"Embedding Dimension: {EMBEDDING_DIM}")
+        print(f"Embedding Dimension: {EMBEDDING_DIM} ({VECTOR_TYPE})")
         print(f"Entities: {collection.num_entities}")
         
     except Exception as e:
@@ -6,52 +6,182 @@ Scans the documents directory and reindexes all files.
 
 import os
 import sys
+import json
+import math
 import argparse
+import asyncio
+import time
 import httpx
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List
+from tqdm import tqdm
+from typing import Callable, Dict, List, Optional
 
 # Configuration
 INDEXER_URL = os.getenv("INDEXER_URL", "http://localhost:8000")
 DOCUMENTS_DIR = os.getenv("DOCUMENTS_DIR", "./documents")
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".doc", ".xlsx", ".xls", ".pptx", ".ppt", ".txt"}
+_EXTS = frozenset(ext.lower() for ext in SUPPORTED_EXTENSIONS)  # Lowercased suffixes for the walk
+BATCH_SIZE = 32  # Files per /index/files request
+SERVER_CONCURRENCY = int(os.getenv("MAX_CONCURRENT_INDEXING", "3"))  # Indexer's max_concurrent_indexing
+FILE_TIMEOUT = 300.0  # Minimum request budget per file (OCR cost follows pages, not size)
+CACHE_FILE = ".reindex-cache.json"  # In the documents directory, for --incremental
 
 
-def get_all_documents(directory: str) -> List[Path]:
-    """Recursively find all supported documents."""
-    documents = []
-    base_path = Path(directory)
+def get_all_documents(directory: str) -> Dict[str, os.stat_result]:
+    """
+    Recursively find all supported documents in a single walk.
     
-    for ext in SUPPORTED_EXTENSIONS:
-        documents.extend(base_path.rglob(f"*{ext}"))
+    Each file is stat'ed once here; empty files, broken symlinks and
+    unreadable files are dropped so they never cost an indexer round-trip.
     
-    return sorted(documents)
+    Returns:
+        {path string: stat result}, sorted by path
+    """
+    documents = {}
+    skipped = 0
+    
+    for root, _dirs, files in os.walk(directory):
+        for name in files:
+            dot = name.rfind(".")
+            if dot > 0 and name[dot:].lower() in _EXTS:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    skipped += 1
+                    continue
+                if stat.st_size == 0 or not os.access(file_path, os.R_OK):
+                    skipped += 1
+                    continue
+                documents[file_path] = stat
+    
+    if skipped:
+        print(f"Skipping {skipped} empty or unreadable files")
+    return dict(sorted(documents.items()))
+
+
+def load_cache(base_dir: Path) -> Dict[str, list]:
+    """Load the {relative path: [mtime_ns, size]} cache of indexed files."""
+    try:
+        with open(base_dir / CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(base_dir: Path, cache: Dict[str, list]):
+    """Write the cache atomically (temp file + os.replace)."""
+    cache_path = base_dir / CACHE_FILE
+    tmp_path = cache_path.with_name(CACHE_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+def file_signature(stat: os.stat_result) -> list:
+    """Modification time and size identifying a version of a file."""
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def batch_timeout(file_sizes: List[int], workers: int, server_concurrency: int) -> float:
+    """
+    Request timeout for a batch.
+    
+    Each file gets 2 s per MB, at least FILE_TIMEOUT. The indexer runs
+    server_concurrency files at a time for all clients together, so with
+    more client workers than that, a batch also waits behind the others:
+    the budget is multiplied by ceil(workers / server_concurrency).
+    """
+    per_batch = sum(max(FILE_TIMEOUT, size / (1 << 20) * 2.0) for size in file_sizes)
+    return per_batch * math.ceil(workers / max(1, server_concurrency))
+
 
+def relative_path(file_path: str, base_prefix: str) -> str:
+    """Path relative to the documents directory (base_prefix ends with a separator)."""
+    return file_path[len(base_prefix):] if file_path.startswith(base_prefix) else file_path
 
-def index_file(file_path: Path, base_dir: Path) -> dict:
-    """Index a single file."""
-    relative_path = file_path.relative_to(base_dir)
+
+async def index_batch(
+    file_paths: List[str],
+    base_prefix: str,
+    client: httpx.AsyncClient,
+    timeout: float = 900.0
+) -> List[dict]:
+    """
+    Index a batch of files with one request, returning one result per file.
     
+    Each result carries the batch request time ("request_ms") and, when the
+    indexer reports it, the file's own indexing time ("elapsed_ms"). When the
+    request times out the indexer may still index (or have indexed) the
+    files, so they are reported with "timed_out" rather than as failures.
+    """
+    start = time.perf_counter()
     try:
-        response = httpx.post(
-            f"{INDEXER_URL}/index/file",
-            json={"file_path": str(file_path)},
-            timeout=300.0  # 5 minutes for large files
+        response = await client.post(
+            "/index/files",
+            json={"file_paths": file_paths},
+            timeout=timeout
         )
         response.raise_for_status()
-        result = response.json()
-        return {
-            "file": str(relative_path),
-            "success": True,
-            "pages": result.get("pages_indexed", 0)
-        }
+        file_results = response.json()["results"]
+    except httpx.TimeoutException as e:
+        return [
+            {
+                "file": relative_path(file_path, base_prefix),
+                "success": False,
+                "timed_out": True,
+                "error": f"Request timed out after {timeout:.0f}s, outcome unknown ({e})"
+            }
+            for file_path in file_paths
+        ]
     except Exception as e:
-        return {
-            "file": str(relative_path),
-            "success": False,
-            "error": str(e)
+        return [
+            {
+                "file": relative_path(file_path, base_prefix),
+                "success": False,
+                "error": str(e)
+            }
+            for file_path in file_paths
+        ]
+    
+    request_ms = round((time.perf_counter() - start) * 1000, 1)
+    
+    results = []
+    for file_path, file_result in zip(file_paths, file_results):
+        result = {
+            "file": relative_path(file_path, base_prefix),
+            "success": file_result.get("success", False),
+            "request_ms": request_ms,
+            "elapsed_ms": file_result.get("elapsed_ms")
         }
+        if result["success"]:
+            result["pages"] = file_result.get("pages_indexed", 0)
+        else:
+            result["error"] = file_result.get("message", "Unknown")
+        results.append(result)
+    return results
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def print_timings(label: str, values: List[float]):
+    """Print count and p50/p95/p99/max of a list of millisecond timings."""
+    if not values:
+        return
+    values = sorted(values)
+    print(
+        f"  {label}: n={len(values)} "
+        f"p50={percentile(values, 50):.0f}ms "
+        f"p95={percentile(values, 95):.0f}ms "
+        f"p99={percentile(values, 99):.0f}ms "
+        f"max={values[-1]:.0f}ms"
+    )
 
 
 def main():
@@ -67,6 +197,28 @@ def main():
         default=4,
         help="Number of parallel workers"
     )
+    parser.add_argument(
+        "--server-concurrency",
+        type=int,
+        default=SERVER_CONCURRENCY,
+        help="Files the indexer processes at once (its MAX_CONCURRENT_INDEXING), for request timeouts"
+    )
+    parser.add_argument(
+        "--batch-size", "-b",
+        type=int,
+        default=BATCH_SIZE,
+        help="Files sent per indexing request"
+    )
+    parser.add_argument(
+        "--log-file",
+        default="reindex.log",
+        help="File receiving one JSON result line per document"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Skip files unchanged since the last run (tracked in {CACHE_FILE})"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -78,23 +230,89 @@ def main():
     base_dir = Path(args.directory).resolve()
     print(f"Scanning: {base_dir}")
     
-    documents = get_all_documents(str(base_dir))
+    base_prefix = os.path.join(os.fspath(base_dir), "")
+    stats = get_all_documents(os.fspath(base_dir))
+    documents = list(stats)
+    
+    # Signatures of the files to index, recorded in the cache once indexed
+    cache = None
+    signatures: Dict[str, list] = {}
+    if args.incremental:
+        cache = load_cache(base_dir)
+        changed = []
+        for doc in documents:
+            doc_key = relative_path(doc, base_prefix)
+            signature = file_signature(stats[doc])
+            if cache.get(doc_key) != signature:
+                signatures[doc_key] = signature
+                changed.append(doc)
+        print(f"Skipping {len(documents) - len(changed)} unchanged documents")
+        documents = changed
+    
+    # Largest files first, so big PDFs don't land alone at the tail of the run
+    sizes = {doc: stats[doc].st_size for doc in documents}
+    documents.sort(key=sizes.__getitem__, reverse=True)
+    
     total = len(documents)
     
     print(f"Found {total} documents to index\n")
     
     if args.dry_run:
         for doc in documents:
-            print(f"  - {doc.relative_to(base_dir)}")
+            print(f"  - {relative_path(doc, base_prefix)}")
         return
     
     if total == 0:
         print("No documents found")
         return
     
+    if cache is None:
+        asyncio.run(run_indexation(documents, sizes, base_prefix, args))
+        return
+    
+    def record_indexed(doc_key: str):
+        cache[doc_key] = signatures[doc_key]
+    
+    try:
+        asyncio.run(run_indexation(documents, sizes, base_prefix, args, record_indexed))
+    finally:
+        save_cache(base_dir, cache)
+
+
+async def run_indexation(
+    documents: List[str],
+    sizes: Dict[str, int],
+    base_prefix: str,
+    args,
+    on_indexed: Optional[Callable[[str], None]] = None
+):
+    """Index all documents concurrently and print the summary."""
+    # One pooled keep-alive client shared by the worker coroutines
+    async with httpx.AsyncClient(
+        base_url=INDEXER_URL,
+        limits=httpx.Limits(
+            max_connections=args.workers * 4,
+            max_keepalive_connections=args.workers * 4
+        ),
+        timeout=300.0
+    ) as client:
+        await index_all(client, documents, sizes, base_prefix, args, on_indexed)
+
+
+async def index_all(
+    client: httpx.AsyncClient,
+    documents: List[str],
+    sizes: Dict[str, int],
+    base_prefix: str,
+    args,
+    on_indexed: Optional[Callable[[str], None]] = None
+):
+    """Index all documents through client and print the summary."""
+    total = len(documents)
+    
     # Check indexer health
     try:
-        health = httpx.get(f"{INDEXER_URL}/status", timeout=5.0)
+        health = await client.get("/status", timeout=5.0)
         health.raise_for_status()
         print(f"✓ Indexer is healthy: {INDEXER_URL}\n")
     except Exception as e:
@@ -104,32 +322,56 @@ def main():
     # Index files in parallel
     success_count = 0
     error_count = 0
+    timeout_count = 0  # Outcome unknown: the indexer may still be working on them
     total_pages = 0
+    request_timings: List[float] = []  # Per batch request, client side
+    file_timings: List[float] = []  # Per file, measured by the indexer
     
     print("=" * 60)
     print("Starting indexation...")
     print("=" * 60)
     
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        futures = {
-            executor.submit(index_file, doc, base_dir): doc 
-            for doc in documents
-        }
+    # A fixed set of workers pulls batches from one shared iterator, so no
+    # per-batch task or future is created up front (at most --workers in flight)
+    batches = (
+        documents[i:i + args.batch_size]
+        for i in range(0, total, args.batch_size)
+    )
+    
+    # One progress bar instead of per-file prints; details go to the log file
+    with tqdm(total=total, unit="file") as progress, \
+            open(args.log_file, "w", encoding="utf-8") as log_file:
+        
+        async def worker():
+            nonlocal success_count, error_count, timeout_count, total_pages
+            for batch in batches:
+                timeout = batch_timeout(
+                    [sizes[doc] for doc in batch], args.workers, args.server_concurrency
+                )
+                results = await index_batch(batch, base_prefix, client, timeout)
+                if results and "request_ms" in results[0]:
+                    request_timings.append(results[0]["request_ms"])
+                for result in results:
+                    log_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    if result.get("elapsed_ms") is not None:
+                        file_timings.append(result["elapsed_ms"])
+                    
+                    if result["success"]:
+                        success_count += 1
+                        total_pages += result.get("pages", 0)
+                        if on_indexed:
+                            on_indexed(result["file"])
+                    elif result.get("timed_out"):
+                        timeout_count += 1
+                    else:
+                        error_count += 1
+                
+                progress.update(len(results))
+                progress.set_postfix(
+                    errors=error_count, timeouts=timeout_count, pages=total_pages, refresh=False
+                )
         
-        for i, future in enumerate(as_completed(futures), 1):
-            result = future.result()
-            
-            status = "✓" if result["success"] else "✗"
-            print(f"[{i}/{total}] {status} {result['file']}")
-            
-            if result["success"]:
-                success_count += 1
-                total_pages += result.get("pages", 0)
-                if result.get("pages"):
-                    print(f"         ({result['pages']} pages)")
-            else:
-                error_count += 1
-                print(f"         Error: {result.get('error', 'Unknown')}")
+        await asyncio.gather(*(worker() for _ in range(args.workers)))
     
     # Summary
     print("\n" + "=" * 60)
@@ -138,7 +380,14 @@ def main():
     print(f"Total documents: {total}")
     print(f"  ✓ Success: {success_count}")
     print(f"  ✗ Errors:  {error_count}")
+    if timeout_count:
+        # Not cached for --incremental: they are sent again on the next run
+        print(f"  ⧗ Timed out: {timeout_count} (outcome unknown, the indexer may still be indexing them)")
     print(f"  Pages indexed: {total_pages}")
+    print("Timings:")
+    print_timings("per file (indexer)", file_timings)
+    print_timings(f"per request (up to {args.batch_size} files)", request_timings)
+    print(f"Details: {args.log_file}")
     
     if error_count > 0:
         sys.exit(1)